@@ -8,12 +8,15 @@ This module provides:
 - Helper functions for structured logging
 """
 
+import atexit
+import copy
 import logging
+import logging.handlers
 import functools
+import queue
 import time
-import traceback
-from contextlib import contextmanager
 from typing import Optional, Any, Callable
+from decouple import config
 from django.http import HttpRequest
 
 
@@ -35,11 +38,120 @@ users_logger = get_logger('users')
 users_views_logger = get_logger('users.views')
 security_logger = get_logger('security')
 
+# Monotonic clock used for all timings in this module
+_pc = time.perf_counter
+
+# Log keyword argument names (not just their count) in log_function_call at DEBUG
+_VERBOSE_ARGS = config('TELEGRAM_ANALYZER_VERBOSE_ARGS', default=False, cast=bool)
+
+
+# =============================================================================
+# ASYNC HANDLERS
+# =============================================================================
+
+_ASYNC_LOGGERS = (
+    telegram_logger,
+    telegram_views_logger,
+    telegram_services_logger,
+    telegram_sync_logger,
+    users_logger,
+    users_views_logger,
+    security_logger,
+)
+
+_queue_listener = None
+_queue_listener_running = False
+
+
+class _RoutingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that tags records with the handler set they belong to."""
+
+    def __init__(self, log_queue, route: int):
+        super().__init__(log_queue)
+        self.route = route
+
+    def prepare(self, record):
+        # Unlike the stdlib prepare, which formats the message and traceback
+        # here, only the arguments are merged (they may change once the call
+        # returns). Each target handler formats the record, exc_info
+        # included, on the listener thread.
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        record.log_route = self.route
+        return record
+
+
+class _RoutingQueueListener(logging.handlers.QueueListener):
+    """QueueListener that hands each record only to its logger's original handlers."""
+
+    def __init__(self, log_queue, routes: list):
+        super().__init__(log_queue, respect_handler_level=True)
+        self.routes = routes
+
+    def handle(self, record):
+        record = self.prepare(record)
+        for handler in self.routes[record.log_route]:
+            if record.levelno >= handler.level:
+                handler.handle(record)
+
+
+def install_async_handlers():
+    """
+    Move handler I/O for the app loggers onto a background thread.
+
+    Each app logger's handlers are replaced by a QueueHandler, and a single
+    QueueListener thread writes the queued records to the original handlers.
+    Safe to call more than once; only the first call has an effect.
+    """
+    global _queue_listener, _queue_listener_running
+    if _queue_listener is not None:
+        return
+
+    log_queue = queue.SimpleQueue()
+    routes = []
+    for app_logger in _ASYNC_LOGGERS:
+        if not app_logger.handlers:
+            continue
+        routes.append(tuple(app_logger.handlers))
+        app_logger.handlers = [_RoutingQueueHandler(log_queue, len(routes) - 1)]
+
+    if not routes:
+        return
+
+    _queue_listener = _RoutingQueueListener(log_queue, routes)
+    _queue_listener.start()
+    _queue_listener_running = True
+    atexit.register(_stop_async_handlers)
+
+
+def _stop_async_handlers():
+    """Flush queued records and stop the listener thread."""
+    global _queue_listener_running
+    if _queue_listener_running:
+        _queue_listener_running = False
+        _queue_listener.stop()
+
 
 # =============================================================================
 # LOGGING DECORATORS
 # =============================================================================
 
+# One [enabled] flag per function log_function_call decorated while its
+# logger was disabled, with the logger and level it was decorated for
+_elided_functions = []
+
+
+def reset_decorator_cache():
+    """
+    Re-check the loggers of functions log_function_call decorated while
+    their logger was disabled. Call this after reloading the logging
+    configuration so they log ENTER/EXIT again if the level is now enabled.
+    """
+    for state, func_logger, level in _elided_functions:
+        state[0] = func_logger.isEnabledFor(level)
+
+
 def log_function_call(logger: Optional[logging.Logger] = None, level: int = logging.DEBUG):
     """
     Decorator to log function entry, exit, and exceptions.
@@ -52,30 +164,59 @@ def log_function_call(logger: Optional[logging.Logger] = None, level: int = logg
         @log_function_call(telegram_logger, logging.INFO)
         def my_important_function():
             pass
+
+    Exceptions are always logged at ERROR. If the logger does not accept
+    ``level`` when the function is decorated, a thin wrapper that only logs
+    exceptions is returned; reset_decorator_cache() re-enables full logging.
     """
     def decorator(func: Callable) -> Callable:
+        func_logger = logger or logging.getLogger(func.__module__)
+        func_name = func.__qualname__
+        verbose_args = _VERBOSE_ARGS and func_logger.isEnabledFor(logging.DEBUG)
+
         @functools.wraps(func)
         def wrapper(*args, **kwargs):
-            func_logger = logger or logging.getLogger(func.__module__)
-            func_name = func.__qualname__
+            enabled = func_logger.isEnabledFor(level)
 
             # Log entry
-            func_logger.log(level, f"ENTER: {func_name}() - args: {len(args)}, kwargs: {list(kwargs.keys())}")
+            if enabled:
+                if verbose_args:
+                    func_logger.log(level, "ENTER: %s() - args: %d, kwargs: %s", func_name, len(args), list(kwargs))
+                else:
+                    func_logger.log(level, "ENTER: %s() - args: %d, kwargs: %d", func_name, len(args), len(kwargs))
 
-            start_time = time.time()
+            start_time = _pc() if enabled else 0.0
             try:
                 result = func(*args, **kwargs)
-                elapsed = time.time() - start_time
-                func_logger.log(level, f"EXIT: {func_name}() - completed in {elapsed:.3f}s")
+                if enabled:
+                    elapsed = _pc() - start_time
+                    func_logger.log(level, "EXIT: %s() - completed in %.3fs", func_name, elapsed)
                 return result
             except Exception as e:
-                elapsed = time.time() - start_time
+                elapsed = _pc() - start_time if enabled else 0.0
                 func_logger.error(
-                    f"ERROR: {func_name}() - {type(e).__name__}: {str(e)} (after {elapsed:.3f}s)"
+                    "ERROR: %s() - %s: %s (after %.3fs)", func_name, type(e).__name__, e, elapsed
                 )
-                func_logger.debug(f"Traceback for {func_name}():\n{traceback.format_exc()}")
+                if func_logger.isEnabledFor(logging.DEBUG):
+                    func_logger.debug("Traceback for %s():", func_name, exc_info=True)
                 raise
-        return wrapper
+
+        if func_logger.isEnabledFor(level):
+            return wrapper
+
+        state = [False]
+        _elided_functions.append((state, func_logger, level))
+
+        @functools.wraps(func)
+        def thin_wrapper(*args, **kwargs):
+            if state[0]:
+                return wrapper(*args, **kwargs)
+            try:
+                return func(*args, **kwargs)
+            except Exception as e:
+                func_logger.error("ERROR: %s() - %s: %s", func_name, type(e).__name__, e)
+                raise
+        return thin_wrapper
     return decorator
 
 
@@ -90,35 +231,40 @@ def log_view(logger: Optional[logging.Logger] = None):
             pass
     """
     def decorator(func: Callable) -> Callable:
+        view_logger = logger or telegram_views_logger
+        view_name = func.__qualname__
+
         @functools.wraps(func)
         def wrapper(request: HttpRequest, *args, **kwargs):
-            view_logger = logger or telegram_views_logger
-            view_name = func.__qualname__
             user = request.user if hasattr(request, 'user') else 'Anonymous'
             user_id = getattr(user, 'id', None) if hasattr(user, 'id') else None
 
+            enabled = view_logger.isEnabledFor(logging.INFO)
+
             # Log request
-            view_logger.info(
-                f"VIEW REQUEST: {view_name} | {request.method} {request.path} | "
-                f"User: {user} (ID: {user_id})"
-            )
+            if enabled:
+                view_logger.info(
+                    "VIEW REQUEST: %s | %s %s | User: %s (ID: %s)",
+                    view_name, request.method, request.path, user, user_id
+                )
 
-            start_time = time.time()
+            start_time = _pc() if enabled else 0.0
             try:
                 response = func(request, *args, **kwargs)
-                elapsed = time.time() - start_time
 
-                status_code = getattr(response, 'status_code', 'N/A')
-                view_logger.info(
-                    f"VIEW RESPONSE: {view_name} | Status: {status_code} | "
-                    f"Time: {elapsed:.3f}s"
-                )
+                if enabled:
+                    elapsed = _pc() - start_time
+                    status_code = getattr(response, 'status_code', 'N/A')
+                    view_logger.info(
+                        "VIEW RESPONSE: %s | Status: %s | Time: %.3fs",
+                        view_name, status_code, elapsed
+                    )
                 return response
             except Exception as e:
-                elapsed = time.time() - start_time
+                elapsed = _pc() - start_time if enabled else 0.0
                 view_logger.error(
-                    f"VIEW ERROR: {view_name} | {type(e).__name__}: {str(e)} | "
-                    f"Time: {elapsed:.3f}s"
+                    "VIEW ERROR: %s | %s: %s | Time: %.3fs",
+                    view_name, type(e).__name__, e, elapsed
                 )
                 raise
         return wrapper
@@ -131,34 +277,40 @@ def log_api_call(logger: Optional[logging.Logger] = None):
     Logs API operation details and timing.
     """
     def decorator(func: Callable) -> Callable:
+        api_logger = logger or telegram_services_logger
+        func_name = func.__qualname__
+
         @functools.wraps(func)
         def wrapper(*args, **kwargs):
-            api_logger = logger or telegram_services_logger
-            func_name = func.__qualname__
+            enabled = api_logger.isEnabledFor(logging.INFO)
 
-            api_logger.info(f"API CALL START: {func_name}")
+            if enabled:
+                api_logger.info("API CALL START: %s", func_name)
 
-            start_time = time.time()
+            start_time = _pc() if enabled else 0.0
             try:
                 result = func(*args, **kwargs)
-                elapsed = time.time() - start_time
 
                 # Log success/failure based on result
-                if isinstance(result, dict):
-                    success = result.get('success', True)
-                    if success:
-                        api_logger.info(f"API CALL SUCCESS: {func_name} - {elapsed:.3f}s")
+                if isinstance(result, dict) and not result.get('success', True):
+                    elapsed = _pc() - start_time if enabled else 0.0
+                    error = result.get('error', 'Unknown error')
+                    api_logger.warning("API CALL FAILED: %s - %s - %.3fs", func_name, error, elapsed)
+                elif enabled:
+                    elapsed = _pc() - start_time
+                    if isinstance(result, dict):
+                        api_logger.info("API CALL SUCCESS: %s - %.3fs", func_name, elapsed)
                     else:
-                        error = result.get('error', 'Unknown error')
-                        api_logger.warning(f"API CALL FAILED: {func_name} - {error} - {elapsed:.3f}s")
-                else:
-                    api_logger.info(f"API CALL COMPLETE: {func_name} - {elapsed:.3f}s")
+                        api_logger.info("API CALL COMPLETE: %s - %.3fs", func_name, elapsed)
 
                 return result
             except Exception as e:
-                elapsed = time.time() - start_time
-                api_logger.error(f"API CALL EXCEPTION: {func_name} - {type(e).__name__}: {str(e)} - {elapsed:.3f}s")
-                api_logger.debug(f"Traceback:\n{traceback.format_exc()}")
+                elapsed = _pc() - start_time if enabled else 0.0
+                api_logger.error(
+                    "API CALL EXCEPTION: %s - %s: %s - %.3fs", func_name, type(e).__name__, e, elapsed
+                )
+                if api_logger.isEnabledFor(logging.DEBUG):
+                    api_logger.debug("Traceback:", exc_info=True)
                 raise
         return wrapper
     return decorator
@@ -168,8 +320,7 @@ def log_api_call(logger: Optional[logging.Logger] = None):
 # CONTEXT MANAGERS
 # =============================================================================
 
-@contextmanager
-def log_operation(operation_name: str, logger: Optional[logging.Logger] = None, level: int = logging.INFO):
+class LogOperation:
     """
     Context manager for logging operations.
 
@@ -178,22 +329,35 @@ def log_operation(operation_name: str, logger: Optional[logging.Logger] = None,
             # do work
             pass
     """
-    op_logger = logger or telegram_logger
-    op_logger.log(level, f"OPERATION START: {operation_name}")
-    start_time = time.time()
-
-    try:
-        yield
-        elapsed = time.time() - start_time
-        op_logger.log(level, f"OPERATION COMPLETE: {operation_name} - {elapsed:.3f}s")
-    except Exception as e:
-        elapsed = time.time() - start_time
-        op_logger.error(f"OPERATION FAILED: {operation_name} - {type(e).__name__}: {str(e)} - {elapsed:.3f}s")
-        raise
-
-
-@contextmanager
-def log_sync_operation(chat_title: str, operation: str = "sync"):
+
+    __slots__ = ('_op', '_logger', '_level', '_enabled', '_t0')
+
+    def __init__(self, operation_name: str, logger: Optional[logging.Logger] = None, level: int = logging.INFO):
+        self._op = operation_name
+        self._logger = logger or telegram_logger
+        self._level = level
+
+    def __enter__(self):
+        self._enabled = self._logger.isEnabledFor(self._level)
+        if self._enabled:
+            self._logger.log(self._level, "OPERATION START: %s", self._op)
+        self._t0 = _pc() if self._enabled else 0.0
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            if self._enabled:
+                elapsed = _pc() - self._t0
+                self._logger.log(self._level, "OPERATION COMPLETE: %s - %.3fs", self._op, elapsed)
+        elif issubclass(exc_type, Exception):
+            elapsed = _pc() - self._t0 if self._enabled else 0.0
+            self._logger.error(
+                "OPERATION FAILED: %s - %s: %s - %.3fs", self._op, exc_type.__name__, exc, elapsed
+            )
+        return False
+
+
+class LogSyncOperation:
     """
     Context manager specifically for sync operations.
 
@@ -202,19 +366,38 @@ def log_sync_operation(chat_title: str, operation: str = "sync"):
             # sync messages
             pass
     """
-    telegram_sync_logger.info(f"SYNC START: {operation} for '{chat_title}'")
-    start_time = time.time()
-
-    try:
-        yield
-        elapsed = time.time() - start_time
-        telegram_sync_logger.info(f"SYNC COMPLETE: {operation} for '{chat_title}' - {elapsed:.3f}s")
-    except Exception as e:
-        elapsed = time.time() - start_time
-        telegram_sync_logger.error(
-            f"SYNC FAILED: {operation} for '{chat_title}' - {type(e).__name__}: {str(e)} - {elapsed:.3f}s"
-        )
-        raise
+
+    __slots__ = ('_chat_title', '_operation', '_enabled', '_t0')
+
+    def __init__(self, chat_title: str, operation: str = "sync"):
+        self._chat_title = chat_title
+        self._operation = operation
+
+    def __enter__(self):
+        self._enabled = telegram_sync_logger.isEnabledFor(logging.INFO)
+        if self._enabled:
+            telegram_sync_logger.info("SYNC START: %s for '%s'", self._operation, self._chat_title)
+        self._t0 = _pc() if self._enabled else 0.0
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            if self._enabled:
+                elapsed = _pc() - self._t0
+                telegram_sync_logger.info(
+                    "SYNC COMPLETE: %s for '%s' - %.3fs", self._operation, self._chat_title, elapsed
+                )
+        elif issubclass(exc_type, Exception):
+            elapsed = _pc() - self._t0 if self._enabled else 0.0
+            telegram_sync_logger.error(
+                "SYNC FAILED: %s for '%s' - %s: %s - %.3fs",
+                self._operation, self._chat_title, exc_type.__name__, exc, elapsed
+            )
+        return False
+
+
+log_operation = LogOperation
+log_sync_operation = LogSyncOperation
 
 
 # =============================================================================
@@ -232,11 +415,15 @@ def log_user_action(user, action: str, details: Optional[str] = None):
     username = getattr(user, 'username', str(user))
     email = getattr(user, 'email', 'N/A')
 
-    message = f"USER ACTION: {action} | User: {username} (ID: {user_id}, Email: {email})"
     if details:
-        message += f" | Details: {details}"
-
-    security_logger.info(message)
+        security_logger.info(
+            "USER ACTION: %s | User: %s (ID: %s, Email: %s) | Details: %s",
+            action, username, user_id, email, details
+        )
+    else:
+        security_logger.info(
+            "USER ACTION: %s | User: %s (ID: %s, Email: %s)", action, username, user_id, email
+        )
 
 
 def log_security_event(event_type: str, user=None, ip_address: Optional[str] = None, details: Optional[str] = None):
@@ -246,48 +433,82 @@ def log_security_event(event_type: str, user=None, ip_address: Optional[str] = N
     Usage:
         log_security_event("failed_login", ip_address="192.168.1.1", details="Invalid password")
     """
-    message = f"SECURITY EVENT: {event_type}"
+    parts = ["SECURITY EVENT: %s"]
+    args = [event_type]
 
     if user:
-        user_id = getattr(user, 'id', None)
-        username = getattr(user, 'username', str(user))
-        message += f" | User: {username} (ID: {user_id})"
+        parts.append("User: %s (ID: %s)")
+        args.append(getattr(user, 'username', str(user)))
+        args.append(getattr(user, 'id', None))
 
     if ip_address:
-        message += f" | IP: {ip_address}"
+        parts.append("IP: %s")
+        args.append(ip_address)
 
     if details:
-        message += f" | Details: {details}"
+        parts.append("Details: %s")
+        args.append(details)
+
+    security_logger.warning(" | ".join(parts), *args)
+
 
-    security_logger.warning(message)
+_TELEGRAM_CONNECTION_FORMAT = "TELEGRAM CONNECTION: %s | User: %s (ID: %s) | Phone: %s"
+_TELEGRAM_CONNECTION_DETAILS_FORMAT = _TELEGRAM_CONNECTION_FORMAT + " | Details: %s"
+_FORWARD_TO_TELEGRAM = {'forward_to_telegram': True}
+
+
+class _ForwardToTelegramHandler(logging.Handler):
+    """Hand security records flagged with ``forward_to_telegram`` on to telegram_logger."""
+
+    def emit(self, record):
+        if getattr(record, 'forward_to_telegram', False) and telegram_logger.isEnabledFor(record.levelno):
+            telegram_logger.handle(record)
+
+
+# A handler only sees records security_logger's level and filters accepted
+security_logger.addHandler(_ForwardToTelegramHandler())
+
+
+@functools.lru_cache(maxsize=1024)
+def _mask_phone(phone_number: str) -> str:
+    """Mask a phone number for logging, keeping the prefix and last two digits."""
+    return phone_number[:4] + "****" + phone_number[-2:] if len(phone_number) > 6 else "****"
 
 
 def log_telegram_connection(user, phone_number: str, status: str, details: Optional[str] = None):
     """
     Log Telegram connection events.
+
+    The record is written to security_logger and forwarded to telegram_logger.
     """
     user_id = getattr(user, 'id', None)
     username = getattr(user, 'username', str(user))
+    masked_phone = _mask_phone(phone_number)
 
-    # Mask phone number for security
-    masked_phone = phone_number[:4] + "****" + phone_number[-2:] if len(phone_number) > 6 else "****"
-
-    message = f"TELEGRAM CONNECTION: {status} | User: {username} (ID: {user_id}) | Phone: {masked_phone}"
     if details:
-        message += f" | Details: {details}"
-
-    telegram_logger.info(message)
-    security_logger.info(message)
+        security_logger.info(
+            _TELEGRAM_CONNECTION_DETAILS_FORMAT, status, username, user_id, masked_phone, details,
+            extra=_FORWARD_TO_TELEGRAM,
+        )
+    else:
+        security_logger.info(
+            _TELEGRAM_CONNECTION_FORMAT, status, username, user_id, masked_phone,
+            extra=_FORWARD_TO_TELEGRAM,
+        )
 
 
 def log_sync_progress(task_id: int, chats_done: int, total_chats: int, messages_synced: int):
     """
     Log sync progress updates.
     """
-    progress = (chats_done / total_chats * 100) if total_chats > 0 else 0
+    if not telegram_sync_logger.isEnabledFor(logging.INFO):
+        return
+
+    # Progress in tenths of a percent, kept in integer arithmetic
+    permille = chats_done * 1000 // total_chats if total_chats > 0 else 0
     telegram_sync_logger.info(
-        f"SYNC PROGRESS: Task #{task_id} | {chats_done}/{total_chats} chats ({progress:.1f}%) | "
-        f"{messages_synced} messages synced"
+        "SYNC PROGRESS: Task #%s | %s/%s chats (%d.%d%%) | %s messages synced",
+        task_id, chats_done, total_chats, permille // 10, permille % 10, messages_synced
     )
 
 
@@ -295,11 +516,15 @@ def log_database_operation(operation: str, model: str, count: int = 1, details:
     """
     Log database operations.
     """
-    message = f"DB OPERATION: {operation} | Model: {model} | Count: {count}"
-    if details:
-        message += f" | Details: {details}"
+    if not telegram_logger.isEnabledFor(logging.DEBUG):
+        return
 
-    telegram_logger.debug(message)
+    if details:
+        telegram_logger.debug(
+            "DB OPERATION: %s | Model: %s | Count: %s | Details: %s", operation, model, count, details
+        )
+    else:
+        telegram_logger.debug("DB OPERATION: %s | Model: %s | Count: %s", operation, model, count)
 
 
 def log_error_with_context(logger: logging.Logger, error: Exception, context: dict):
@@ -314,18 +539,19 @@ def log_error_with_context(logger: logging.Logger, error: Exception, context: di
         })
     """
     context_str = " | ".join(f"{k}={v}" for k, v in context.items())
-    logger.error(f"ERROR: {type(error).__name__}: {str(error)} | Context: {context_str}")
-    logger.debug(f"Full traceback:\n{traceback.format_exc()}")
+    logger.error("ERROR: %s: %s | Context: %s", type(error).__name__, error, context_str)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Full traceback:", exc_info=True)
 
 
 def get_client_ip(request: HttpRequest) -> str:
     """Extract client IP address from request."""
-    x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
+    meta = request.META
+    x_forwarded_for = meta.get('HTTP_X_FORWARDED_FOR')
     if x_forwarded_for:
-        ip = x_forwarded_for.split(',')[0].strip()
-    else:
-        ip = request.META.get('REMOTE_ADDR', 'unknown')
-    return ip
+        # Only the first (client) hop is needed; partition avoids splitting every hop
+        return x_forwarded_for.partition(',')[0].strip()
+    return meta.get('REMOTE_ADDR', 'unknown')
 
 
 # =============================================================================
@@ -336,6 +562,9 @@ class PerformanceLogger:
     """
     Class for detailed performance logging.
 
+    Checkpoints are collected in memory and reported in the single summary
+    record written by finish().
+
     Usage:
         perf = PerformanceLogger("sync_operation", telegram_sync_logger)
         perf.checkpoint("fetched_chats")
@@ -346,23 +575,21 @@ class PerformanceLogger:
     def __init__(self, operation_name: str, logger: Optional[logging.Logger] = None):
         self.operation_name = operation_name
         self.logger = logger or telegram_logger
-        self.start_time = time.time()
+        self.start_time = _pc()
         self.checkpoints = []
-        self.logger.info(f"PERF START: {operation_name}")
+        self.logger.info("PERF START: %s", operation_name)
 
     def checkpoint(self, name: str, details: Optional[str] = None):
         """Record a checkpoint."""
-        elapsed = time.time() - self.start_time
-        self.checkpoints.append((name, elapsed))
-        message = f"PERF CHECKPOINT: {self.operation_name} | {name} | {elapsed:.3f}s"
-        if details:
-            message += f" | {details}"
-        self.logger.debug(message)
+        self.checkpoints.append((name, _pc() - self.start_time, details))
 
     def finish(self, details: Optional[str] = None):
         """Finish and log summary."""
-        total_time = time.time() - self.start_time
-        checkpoint_summary = ", ".join(f"{name}: {time:.3f}s" for name, time in self.checkpoints)
+        total_time = _pc() - self.start_time
+        checkpoint_summary = ", ".join(
+            f"{name}: {elapsed:.3f}s ({cp_details})" if cp_details else f"{name}: {elapsed:.3f}s"
+            for name, elapsed, cp_details in self.checkpoints
+        )
 
         message = f"PERF COMPLETE: {self.operation_name} | Total: {total_time:.3f}s"
         if checkpoint_summary:
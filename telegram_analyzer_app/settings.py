@@ -84,6 +84,9 @@ DATABASES = {
         'PASSWORD': config('DB_POSTGRESQL_PASSWORD'),
         'HOST': config('DB_POSTGRESQL_HOST'),
         'PORT': config('DB_POSTGRESQL_PORT'),
+        # Reuse connections across requests instead of reconnecting each time
+        'CONN_MAX_AGE': config('DB_CONN_MAX_AGE', default=600, cast=int),
+        'CONN_HEALTH_CHECKS': True,
     }
 }
 
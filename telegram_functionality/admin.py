@@ -1,27 +1,96 @@
 from django.contrib import admin
+from django.db.models.functions import Substr
 from .models import TelegramSession, TelegramChat, TelegramMessage, SyncTask
 
 
+_SESSION_FIELDSETS = (
+    (None, {
+        'fields': ('user', 'phone_number', 'display_name', 'is_active', 'is_current')
+    }),
+    ('Telegram Info', {
+        'fields': ('telegram_user_id', 'telegram_username', 'telegram_first_name', 'telegram_last_name')
+    }),
+    ('Timestamps', {
+        'fields': ('created_at', 'updated_at'),
+        'classes': ('collapse',)
+    }),
+)
+
+_MESSAGE_FIELDSETS = (
+    (None, {
+        'fields': ('chat', 'message_id', 'text', 'date')
+    }),
+    ('Sender Info', {
+        'fields': ('sender_id', 'sender_name', 'is_outgoing')
+    }),
+    ('Media', {
+        'fields': ('has_media', 'media_type'),
+        'classes': ('collapse',)
+    }),
+    ('Message Details', {
+        'fields': ('reply_to_msg_id', 'forwards', 'views'),
+        'classes': ('collapse',)
+    }),
+    ('Deletion Status', {
+        'fields': ('is_deleted', 'deleted_at')
+    }),
+    ('Sync Info', {
+        'fields': ('first_seen_at', 'last_seen_at'),
+        'classes': ('collapse',)
+    }),
+)
+
+_SYNC_TASK_FIELDSETS = (
+    (None, {
+        'fields': ('session', 'task_type', 'status')
+    }),
+    ('Progress', {
+        'fields': ('total_chats', 'synced_chats', 'total_messages', 'synced_messages', 'new_messages')
+    }),
+    ('Current Activity', {
+        'fields': ('current_chat_id', 'current_chat_title', 'current_chat_progress')
+    }),
+    ('Timestamps', {
+        'fields': ('created_at', 'started_at', 'completed_at')
+    }),
+    ('Error', {
+        'fields': ('error_message',),
+        'classes': ('collapse',)
+    }),
+    ('Log', {
+        'fields': ('log',),
+        'classes': ('collapse',)
+    }),
+)
+
+# Add forms leave out the sections that only hold values set by the app
+_SESSION_ADD_FIELDSETS = _SESSION_FIELDSETS[:2]
+_MESSAGE_ADD_FIELDSETS = _MESSAGE_FIELDSETS[:-1]
+_SYNC_TASK_ADD_FIELDSETS = _SYNC_TASK_FIELDSETS[:1]
+
+
+class _PrebuiltFieldsetsMixin:
+    """Serve the fieldsets constants as they are instead of copying them per request."""
+
+    add_fieldsets = None
+
+    def get_fieldsets(self, request, obj=None):
+        if obj is None and self.add_fieldsets is not None:
+            return self.add_fieldsets
+        return self.fieldsets
+
+
 @admin.register(TelegramSession)
-class TelegramSessionAdmin(admin.ModelAdmin):
+class TelegramSessionAdmin(_PrebuiltFieldsetsMixin, admin.ModelAdmin):
     list_display = ('user', 'phone_number', 'display_name', 'telegram_username', 'is_active', 'is_current', 'created_at')
     list_filter = ('is_active', 'is_current', 'created_at')
     search_fields = ('user__email', 'phone_number', 'telegram_username', 'display_name')
     readonly_fields = ('created_at', 'updated_at', 'telegram_user_id')
     list_editable = ('is_current',)
+    list_select_related = ('user',)
 
-    fieldsets = (
-        (None, {
-            'fields': ('user', 'phone_number', 'display_name', 'is_active', 'is_current')
-        }),
-        ('Telegram Info', {
-            'fields': ('telegram_user_id', 'telegram_username', 'telegram_first_name', 'telegram_last_name')
-        }),
-        ('Timestamps', {
-            'fields': ('created_at', 'updated_at'),
-            'classes': ('collapse',)
-        }),
-    )
+    fieldsets = _SESSION_FIELDSETS
+    add_fieldsets = _SESSION_ADD_FIELDSETS
 
 
 @admin.register(TelegramChat)
@@ -30,76 +99,52 @@ class TelegramChatAdmin(admin.ModelAdmin):
     list_filter = ('chat_type', 'is_archived', 'is_pinned', 'last_synced')
     search_fields = ('title', 'username', 'session__user__email')
     readonly_fields = ('chat_id', 'last_synced', 'last_full_sync', 'total_messages')
+    list_select_related = ('session', 'session__user')
 
 
 @admin.register(TelegramMessage)
-class TelegramMessageAdmin(admin.ModelAdmin):
+class TelegramMessageAdmin(_PrebuiltFieldsetsMixin, admin.ModelAdmin):
     list_display = ('message_id', 'chat', 'sender_name', 'text_preview', 'date', 'is_deleted', 'deleted_at')
     list_filter = ('is_deleted', 'is_outgoing', 'has_media', 'chat__chat_type')
     search_fields = ('text', 'sender_name', 'chat__title')
     readonly_fields = ('message_id', 'first_seen_at', 'last_seen_at')
     date_hierarchy = 'date'
+    list_select_related = ('chat',)
+
+    # Columns the change list renders; chat is shown through TelegramChat.__str__
+    changelist_fields = (
+        'message_id', 'chat__title', 'chat__chat_type', 'sender_name', 'date', 'is_deleted', 'deleted_at',
+    )
+
+    def get_queryset(self, request):
+        queryset = super().get_queryset(request)
+        match = request.resolver_match
+        if match is None or match.url_name != f'{self.opts.app_label}_{self.opts.model_name}_changelist':
+            return queryset
+        # The list only shows a preview, so fetch one character past it instead of the full text
+        return queryset.annotate(text_head=Substr('text', 1, 51)).only(*self.changelist_fields)
 
     def text_preview(self, obj):
-        return obj.text[:50] + '...' if len(obj.text) > 50 else obj.text
+        head = obj.text_head
+        return f"{head[:50]}..." if len(head) > 50 else head
     text_preview.short_description = 'Text'
 
-    fieldsets = (
-        (None, {
-            'fields': ('chat', 'message_id', 'text', 'date')
-        }),
-        ('Sender Info', {
-            'fields': ('sender_id', 'sender_name', 'is_outgoing')
-        }),
-        ('Media', {
-            'fields': ('has_media', 'media_type'),
-            'classes': ('collapse',)
-        }),
-        ('Message Details', {
-            'fields': ('reply_to_msg_id', 'forwards', 'views'),
-            'classes': ('collapse',)
-        }),
-        ('Deletion Status', {
-            'fields': ('is_deleted', 'deleted_at')
-        }),
-        ('Sync Info', {
-            'fields': ('first_seen_at', 'last_seen_at'),
-            'classes': ('collapse',)
-        }),
-    )
+    fieldsets = _MESSAGE_FIELDSETS
+    add_fieldsets = _MESSAGE_ADD_FIELDSETS
 
 
 @admin.register(SyncTask)
-class SyncTaskAdmin(admin.ModelAdmin):
+class SyncTaskAdmin(_PrebuiltFieldsetsMixin, admin.ModelAdmin):
     list_display = ('id', 'session', 'task_type', 'status', 'progress_display', 'created_at', 'completed_at')
     list_filter = ('status', 'task_type', 'created_at')
     search_fields = ('session__user__email',)
     readonly_fields = ('created_at', 'started_at', 'completed_at', 'log')
     ordering = ('-created_at',)
+    list_select_related = ('session', 'session__user')
 
     def progress_display(self, obj):
         return f"{obj.synced_chats}/{obj.total_chats} chats, {obj.synced_messages} msgs"
     progress_display.short_description = 'Progress'
 
-    fieldsets = (
-        (None, {
-            'fields': ('session', 'task_type', 'status')
-        }),
-        ('Progress', {
-            'fields': ('total_chats', 'synced_chats', 'total_messages', 'synced_messages', 'new_messages')
-        }),
-        ('Current Activity', {
-            'fields': ('current_chat_id', 'current_chat_title', 'current_chat_progress')
-        }),
-        ('Timestamps', {
-            'fields': ('created_at', 'started_at', 'completed_at')
-        }),
-        ('Error', {
-            'fields': ('error_message',),
-            'classes': ('collapse',)
-        }),
-        ('Log', {
-            'fields': ('log',),
-            'classes': ('collapse',)
-        }),
-    )
+    fieldsets = _SYNC_TASK_FIELDSETS
+    add_fieldsets = _SYNC_TASK_ADD_FIELDSETS
@@ -1,21 +1,120 @@
 """
 Analytics module for computing statistics and insights from Telegram data.
 """
+import bisect
+import functools
+import hashlib
+import inspect
+import json
 import re
 from collections import Counter, defaultdict
-from datetime import datetime, timedelta
-from django.db.models import Count, Sum, Q, F
-from django.db.models.functions import TruncDate, TruncHour, ExtractHour, ExtractWeekDay
+from datetime import date, datetime, time, timedelta
+from itertools import batched
+from urllib.parse import urlparse
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection
+from django.db.models import Count, Sum, Q, F, Min, Max, Avg, OuterRef, Subquery
+from django.db.models.functions import TruncHour, ExtractWeekDay, Coalesce
 from django.utils import timezone
 
-from .models import TelegramMessage, TelegramChat, TelegramSession, AnalyticsCache
+from .models import TelegramMessage, TelegramChat, TelegramSession, AnalyticsCache, MessageDailyRollup
+
+try:
+    import emoji
+except ImportError:  # optional dependency, only needed for emoji stats
+    emoji = None
+
+# Rows fetched per round-trip when streaming message texts
+TEXT_CHUNK_SIZE = 5000
+
+# Seconds a cached analytics result stays valid
+ANALYTICS_CACHE_TTL = 600
+
+WORD_PATTERN = re.compile(r'\b[a-zA-Zа-яА-ЯёЁіІїЇєЄ]+\b')
+# Postgres ARE equivalent of WORD_PATTERN for lower-cased text (\y is a word boundary)
+WORD_SQL_PATTERN = r'\y([a-zа-яёіїє]+)\y'
+URL_PATTERN = re.compile(r'https?://[^\s<>"{}|\\^`\[\]]+')
+# Postgres ARE equivalent of URL_PATTERN capturing the netloc
+URL_DOMAIN_SQL_PATTERN = r'https?://([^/?#\s<>"{}|\\^`\[\]]+)'
+
+
+@functools.lru_cache(maxsize=None)
+def _get_emoji_pattern():
+    """Build a regex matching any single-character emoji (compiled once)."""
+    if emoji is None:
+        return None
+
+    chars = ''.join(re.escape(key) for key in emoji.EMOJI_DATA if len(key) == 1)
+    return re.compile(f'[{chars}]')
+
+
+def _cache_key_value(value):
+    """Normalize a call argument so equal queries share one cache key."""
+    if isinstance(value, str):
+        # Views pass ids from request.GET as strings, other callers as ints
+        value = value.strip()
+        if not value:
+            return None
+        try:
+            return int(value)
+        except ValueError:
+            return value
+    if isinstance(value, date):
+        return value.isoformat()
+    return value
+
+
+def cached_analytic(cache_type, ttl=ANALYTICS_CACHE_TTL):
+    """
+    Memoize an AnalyticsService method in AnalyticsCache for ``ttl`` seconds.
+
+    Results are keyed by session, ``cache_type`` and the bound call arguments
+    (defaults applied, numeric strings and dates normalized), and are
+    dropped whenever the session's message rollups are refreshed. Results
+    are always returned as decoded JSON, so dates come back as ISO strings
+    whether or not the cache was warm.
+    """
+    def decorator(func):
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        def wrapper(self, *args, **kwargs):
+            bound = signature.bind(self, *args, **kwargs)
+            bound.apply_defaults()
+            arguments = sorted((k, _cache_key_value(v)) for k, v in bound.arguments.items() if k != 'self')
+            cache_key = hashlib.md5(repr(arguments).encode()).hexdigest()
+
+            now = timezone.now()
+            cached = AnalyticsCache.objects.filter(
+                session=self.session,
+                cache_type=cache_type,
+                cache_key=cache_key,
+                expires_at__gt=now,
+            ).values_list('data', flat=True).first()
+            if cached is not None:
+                return cached
+
+            # Round-trip through JSON so a miss returns the same types
+            # (e.g. ISO strings for dates) as a later hit
+            result = json.loads(json.dumps(func(self, *args, **kwargs), cls=DjangoJSONEncoder))
+            AnalyticsCache.objects.update_or_create(
+                session=self.session,
+                cache_type=cache_type,
+                cache_key=cache_key,
+                defaults={'data': result, 'expires_at': now + timedelta(seconds=ttl)},
+            )
+            return result
+
+        return wrapper
+
+    return decorator
 
 
 class AnalyticsService:
     """Service for computing analytics and statistics."""
 
     # Common stop words to exclude from word frequency
-    STOP_WORDS = {
+    STOP_WORDS = frozenset({
         'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for',
         'of', 'with', 'by', 'from', 'is', 'are', 'was', 'were', 'be', 'been',
         'being', 'have', 'has', 'had', 'do', 'does', 'did', 'will', 'would',
@@ -27,7 +126,16 @@ class AnalyticsService:
         'just', 'also', 'now', 'here', 'there', 'then', 'if', 'else', 'as',
         'до', 'на', 'в', 'и', 'с', 'по', 'у', 'за', 'из', 'о', 'от', 'к', 'не',
         'что', 'это', 'как', 'так', 'все', 'он', 'она', 'они', 'мы', 'вы', 'я',
-    }
+    })
+
+    # Message length buckets as (min, max, label), in ascending order
+    LENGTH_RANGES = [
+        (0, 10, 'Very Short (1-10)'),
+        (11, 50, 'Short (11-50)'),
+        (51, 200, 'Medium (51-200)'),
+        (201, 500, 'Long (201-500)'),
+        (501, 10000, 'Very Long (500+)'),
+    ]
 
     def __init__(self, session: TelegramSession):
         self.session = session
@@ -39,117 +147,132 @@ class AnalyticsService:
         if chat_id:
             qs = qs.filter(chat__chat_id=chat_id)
 
+        # Compare against datetime bounds rather than date__date so the
+        # (chat, date) index can serve the range
         if date_from:
-            qs = qs.filter(date__date__gte=date_from)
+            qs = qs.filter(date__gte=timezone.make_aware(datetime.combine(date_from, time.min)))
 
         if date_to:
-            qs = qs.filter(date__date__lte=date_to)
+            qs = qs.filter(date__lt=timezone.make_aware(datetime.combine(date_to + timedelta(days=1), time.min)))
 
         return qs
 
+    def iter_text_batches(self, messages):
+        """Stream the non-empty texts of a messages queryset in batches."""
+        texts = messages.exclude(text='').values_list('text', flat=True).iterator(chunk_size=TEXT_CHUNK_SIZE)
+        return batched(texts, TEXT_CHUNK_SIZE)
+
+    def get_rollup_queryset(self, chat_id=None, date_from=None):
+        """Get daily rollup rows for the session with optional filters."""
+        qs = MessageDailyRollup.objects.filter(session=self.session)
+
+        if chat_id:
+            qs = qs.filter(chat__chat_id=chat_id)
+
+        if date_from:
+            qs = qs.filter(day__gte=date_from)
+
+        return qs
+
+    @cached_analytic('overview')
     def get_overview_stats(self):
         """Get general overview statistics."""
         messages = self.get_messages_queryset()
 
-        total_messages = messages.count()
-        total_chats = TelegramChat.objects.filter(session=self.session).count()
-        deleted_messages = messages.filter(is_deleted=True).count()
-        media_messages = messages.filter(has_media=True).count()
-        outgoing_messages = messages.filter(is_outgoing=True).count()
-
-        # Date range
-        date_range = messages.aggregate(
-            first_message=models.Min('date'),
-            last_message=models.Max('date')
+        # All message counts and the date range in a single query
+        stats = messages.aggregate(
+            total=Count('id'),
+            deleted=Count('id', filter=Q(is_deleted=True)),
+            media=Count('id', filter=Q(has_media=True)),
+            outgoing=Count('id', filter=Q(is_outgoing=True)),
+            first_message=Min('date'),
+            last_message=Max('date'),
         )
+        total_chats = TelegramChat.objects.filter(session=self.session).count()
 
         return {
-            'total_messages': total_messages,
+            'total_messages': stats['total'],
             'total_chats': total_chats,
-            'deleted_messages': deleted_messages,
-            'media_messages': media_messages,
-            'outgoing_messages': outgoing_messages,
-            'incoming_messages': total_messages - outgoing_messages,
-            'first_message_date': date_range['first_message'],
-            'last_message_date': date_range['last_message'],
+            'deleted_messages': stats['deleted'],
+            'media_messages': stats['media'],
+            'outgoing_messages': stats['outgoing'],
+            'incoming_messages': stats['total'] - stats['outgoing'],
+            'first_message_date': stats['first_message'],
+            'last_message_date': stats['last_message'],
         }
 
+    @cached_analytic('daily_stats')
     def get_daily_message_counts(self, days=30, chat_id=None):
         """Get message counts per day for the last N days."""
         date_from = timezone.now().date() - timedelta(days=days)
-        messages = self.get_messages_queryset(chat_id=chat_id, date_from=date_from)
+        rollups = self.get_rollup_queryset(chat_id=chat_id, date_from=date_from)
 
-        daily_counts = messages.annotate(
-            day=TruncDate('date')
-        ).values('day').annotate(
-            count=Count('id'),
-            outgoing=Count('id', filter=Q(is_outgoing=True)),
-            incoming=Count('id', filter=Q(is_outgoing=False)),
-            deleted=Count('id', filter=Q(is_deleted=True)),
+        daily_counts = rollups.values('day').annotate(
+            count=Sum('count'),
+            outgoing=Sum('outgoing'),
+            incoming=Sum('incoming'),
+            deleted=Sum('deleted'),
         ).order_by('day')
 
         return list(daily_counts)
 
+    @cached_analytic('hourly_activity')
     def get_hourly_activity(self, chat_id=None, days=30):
         """Get message activity by hour of day."""
         date_from = timezone.now().date() - timedelta(days=days)
-        messages = self.get_messages_queryset(chat_id=chat_id, date_from=date_from)
+        rollups = self.get_rollup_queryset(chat_id=chat_id, date_from=date_from)
 
-        hourly = messages.annotate(
-            hour=ExtractHour('date')
-        ).values('hour').annotate(
-            count=Count('id')
-        ).order_by('hour')
+        # Sum the per-day hour histograms of the window
+        hour_data = [0] * 24
+        for hour_counts in rollups.values_list('hour_counts', flat=True).iterator(chunk_size=TEXT_CHUNK_SIZE):
+            for hour, count in enumerate(hour_counts):
+                hour_data[hour] += count
 
-        # Fill in missing hours with 0
-        hour_data = {h: 0 for h in range(24)}
-        for item in hourly:
-            hour_data[item['hour']] = item['count']
-
-        return [{'hour': h, 'count': c} for h, c in hour_data.items()]
+        return [{'hour': h, 'count': c} for h, c in enumerate(hour_data)]
 
+    @cached_analytic('weekly_activity')
     def get_weekly_activity(self, chat_id=None, days=90):
         """Get message activity by day of week (0=Sunday, 6=Saturday)."""
         date_from = timezone.now().date() - timedelta(days=days)
-        messages = self.get_messages_queryset(chat_id=chat_id, date_from=date_from)
+        rollups = self.get_rollup_queryset(chat_id=chat_id, date_from=date_from)
 
-        weekly = messages.annotate(
-            weekday=ExtractWeekDay('date')
-        ).values('weekday').annotate(
-            count=Count('id')
-        ).order_by('weekday')
+        weekly = rollups.annotate(
+            weekday=ExtractWeekDay('day')
+        ).values_list('weekday').annotate(
+            count=Sum('count')
+        ).order_by()
 
         # Day names
         day_names = ['Sunday', 'Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday']
-        weekday_data = {i: 0 for i in range(1, 8)}
+        weekday_data = [0] * 7
 
-        for item in weekly:
-            weekday_data[item['weekday']] = item['count']
+        for weekday, count in weekly:
+            weekday_data[weekday - 1] = count
 
-        return [{'day': day_names[i-1], 'day_num': i, 'count': weekday_data[i]} for i in range(1, 8)]
+        return [{'day': day_names[i-1], 'day_num': i, 'count': weekday_data[i-1]} for i in range(1, 8)]
 
+    @cached_analytic('activity_heatmap')
     def get_activity_heatmap(self, days=90, chat_id=None):
         """Get activity data for calendar heatmap."""
         date_from = timezone.now().date() - timedelta(days=days)
-        messages = self.get_messages_queryset(chat_id=chat_id, date_from=date_from)
+        rollups = self.get_rollup_queryset(chat_id=chat_id, date_from=date_from)
 
-        daily = messages.annotate(
-            day=TruncDate('date')
-        ).values('day').annotate(
-            count=Count('id')
+        daily = rollups.values('day').annotate(
+            count=Sum('count')
         ).order_by('day')
 
         # Convert to dict format for heatmap
         return {str(item['day']): item['count'] for item in daily}
 
+    @cached_analytic('top_chats')
     def get_top_chats(self, limit=10):
         """Get top chats by message count."""
         chats = TelegramChat.objects.filter(
             session=self.session
         ).annotate(
-            message_count=Count('messages'),
-            deleted_count=Count('messages', filter=Q(messages__is_deleted=True)),
-            media_count=Count('messages', filter=Q(messages__has_media=True)),
+            message_count=Coalesce(Sum('daily_rollups__count'), 0),
+            deleted_count=Coalesce(Sum('daily_rollups__deleted'), 0),
+            media_count=Coalesce(Sum('daily_rollups__media_count'), 0),
         ).order_by('-message_count')[:limit]
 
         return list(chats.values(
@@ -176,21 +299,36 @@ class AnalyticsService:
         date_from = timezone.now().date() - timedelta(days=days)
         messages = self.get_messages_queryset(chat_id=chat_id, date_from=date_from)
 
-        # Get all message texts
-        texts = messages.exclude(text='').values_list('text', flat=True)
+        if connection.vendor == 'postgresql':
+            return self._get_word_frequency_sql(messages, limit, min_word_length)
 
         # Count words
         word_counter = Counter()
-        word_pattern = re.compile(r'\b[a-zA-Zа-яА-ЯёЁіІїЇєЄ]+\b', re.UNICODE)
+        findall = WORD_PATTERN.findall
+        update = word_counter.update
+        stop_words = self.STOP_WORDS
 
-        for text in texts:
-            if text:
-                words = word_pattern.findall(text.lower())
-                words = [w for w in words if len(w) >= min_word_length and w not in self.STOP_WORDS]
-                word_counter.update(words)
+        # Tokenize a whole batch of texts per regex call; the newline separator
+        # is a non-word character, so words never run across message boundaries
+        for batch in self.iter_text_batches(messages):
+            words = findall('\n'.join(batch).lower())
+            update(w for w in words if len(w) >= min_word_length and w not in stop_words)
 
         return word_counter.most_common(limit)
 
+    def _get_word_frequency_sql(self, messages, limit, min_word_length):
+        """Tokenize and count words inside Postgres with regexp_matches."""
+        inner_sql, params = messages.exclude(text='').order_by().values('text').query.sql_with_params()
+        sql = (
+            "SELECT m[1] AS word, COUNT(*) AS n "
+            f"FROM ({inner_sql}) AS t, LATERAL regexp_matches(lower(t.text), %s, 'g') AS m "
+            "WHERE length(m[1]) >= %s AND m[1] <> ALL(%s) "
+            "GROUP BY m[1] ORDER BY n DESC LIMIT %s"
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [*params, WORD_SQL_PATTERN, min_word_length, list(self.STOP_WORDS), limit])
+            return cursor.fetchall()
+
     def get_media_stats(self, chat_id=None):
         """Get statistics about media files."""
         messages = self.get_messages_queryset(chat_id=chat_id).filter(has_media=True)
@@ -201,32 +339,43 @@ class AnalyticsService:
             total_size=Sum('media_file_size'),
         ).order_by('-count')
 
-        # Count downloaded vs not downloaded
-        downloaded = messages.exclude(media_file='').exclude(media_file__isnull=True).count()
-        not_downloaded = messages.filter(Q(media_file='') | Q(media_file__isnull=True)).count()
-
-        # Total size
-        total_size = messages.aggregate(total=Sum('media_file_size'))['total'] or 0
+        # Downloaded vs not downloaded and total size in one pass
+        not_downloaded_q = Q(media_file='') | Q(media_file__isnull=True)
+        totals = messages.aggregate(
+            downloaded=Count('id', filter=~not_downloaded_q),
+            not_downloaded=Count('id', filter=not_downloaded_q),
+            total_size=Sum('media_file_size'),
+        )
 
         return {
             'by_type': list(media_types),
-            'downloaded': downloaded,
-            'not_downloaded': not_downloaded,
-            'total_size': total_size,
-            'total_count': downloaded + not_downloaded,
+            'downloaded': totals['downloaded'],
+            'not_downloaded': totals['not_downloaded'],
+            'total_size': totals['total_size'] or 0,
+            'total_count': totals['downloaded'] + totals['not_downloaded'],
         }
 
+    @cached_analytic('chat_types')
     def get_chat_type_distribution(self):
         """Get distribution of chats by type."""
         chats = TelegramChat.objects.filter(session=self.session)
 
-        distribution = chats.values('chat_type').annotate(
+        # Message totals come from a per-chat subquery so the chat count is
+        # not multiplied by a join against every message row
+        message_totals = MessageDailyRollup.objects.filter(
+            chat=OuterRef('pk')
+        ).order_by().values('chat').annotate(total=Sum('count')).values('total')
+
+        distribution = chats.annotate(
+            message_total=Coalesce(Subquery(message_totals), 0),
+        ).values('chat_type').annotate(
             count=Count('id'),
-            messages=Count('messages'),
+            messages=Sum('message_total'),
         ).order_by('-count')
 
         return list(distribution)
 
+    @cached_analytic('message_lengths')
     def get_message_length_stats(self, chat_id=None, days=30):
         """Get statistics about message lengths."""
         from django.db.models.functions import Length
@@ -236,22 +385,20 @@ class AnalyticsService:
 
         messages = messages.exclude(text='').annotate(text_length=Length('text'))
 
-        # Get length distribution
-        length_ranges = [
-            (0, 10, 'Very Short (1-10)'),
-            (11, 50, 'Short (11-50)'),
-            (51, 200, 'Medium (51-200)'),
-            (201, 500, 'Long (201-500)'),
-            (501, 10000, 'Very Long (500+)'),
-        ]
+        length_ranges = self.LENGTH_RANGES
 
-        distribution = []
-        for min_len, max_len, label in length_ranges:
-            count = messages.filter(text_length__gte=min_len, text_length__lte=max_len).count()
-            distribution.append({'label': label, 'count': count})
+        # Bucket counts and average length in a single query
+        buckets = {
+            f'bucket_{i}': Count('id', filter=Q(text_length__gte=min_len, text_length__lte=max_len))
+            for i, (min_len, max_len, _) in enumerate(length_ranges)
+        }
+        totals = messages.aggregate(avg=Avg('text_length'), **buckets)
 
-        # Average length
-        avg_length = messages.aggregate(avg=models.Avg('text_length'))['avg'] or 0
+        distribution = [
+            {'label': label, 'count': totals[f'bucket_{i}']}
+            for i, (_, _, label) in enumerate(length_ranges)
+        ]
+        avg_length = totals['avg'] or 0
 
         return {
             'distribution': distribution,
@@ -265,22 +412,25 @@ class AnalyticsService:
         date_from = timezone.now().date() - timedelta(days=days)
         messages = self.get_messages_queryset(chat_id=chat_id, date_from=date_from)
 
+        messages = messages.filter(chat__chat_type='user')  # Only private chats
+
+        if connection.vendor == 'postgresql':
+            return self._get_response_time_stats_sql(messages)
+
         # Get messages ordered by date for each chat
-        messages = messages.filter(
-            chat__chat_type='user'  # Only private chats
-        ).order_by('chat', 'date')
+        messages = messages.order_by('chat', 'date')
 
         # Calculate time differences between incoming and outgoing
         response_times = []
-        prev_msg = None
+        prev_chat_id = prev_date = prev_outgoing = None
 
-        for msg in messages.values('chat_id', 'date', 'is_outgoing')[:1000]:
-            if prev_msg and prev_msg['chat_id'] == msg['chat_id']:
-                if prev_msg['is_outgoing'] != msg['is_outgoing']:
-                    diff = (msg['date'] - prev_msg['date']).total_seconds()
-                    if 0 < diff < 86400:  # Less than 24 hours
-                        response_times.append(diff)
-            prev_msg = msg
+        rows = messages.values_list('chat_id', 'date', 'is_outgoing')[:1000].iterator(chunk_size=2000)
+        for chat_id, date, is_outgoing in rows:
+            if prev_chat_id == chat_id and prev_outgoing != is_outgoing:
+                diff = (date - prev_date).total_seconds()
+                if 0 < diff < 86400:  # Less than 24 hours
+                    response_times.append(diff)
+            prev_chat_id, prev_date, prev_outgoing = chat_id, date, is_outgoing
 
         if response_times:
             avg_response = sum(response_times) / len(response_times)
@@ -292,50 +442,142 @@ class AnalyticsService:
 
         return None
 
+    def _get_response_time_stats_sql(self, messages):
+        """Average reply gaps over the whole range using LAG() in Postgres."""
+        inner_sql, params = messages.order_by().values('chat_id', 'date', 'is_outgoing').query.sql_with_params()
+        sql = (
+            "SELECT AVG(diff), COUNT(*) FROM ("
+            "SELECT EXTRACT(EPOCH FROM t.date - LAG(t.date) OVER w) AS diff, "
+            "t.is_outgoing <> LAG(t.is_outgoing) OVER w AS switched "
+            f"FROM ({inner_sql}) AS t "
+            "WINDOW w AS (PARTITION BY t.chat_id ORDER BY t.date)"
+            ") AS d WHERE switched AND diff > 0 AND diff < 86400"
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            avg_response, sample_size = cursor.fetchone()
+
+        if sample_size:
+            avg_response = float(avg_response)
+            return {
+                'average_seconds': round(avg_response, 1),
+                'average_minutes': round(avg_response / 60, 1),
+                'sample_size': sample_size,
+            }
+
+        return None
+
     def get_emoji_stats(self, chat_id=None, days=30, limit=20):
         """Get emoji usage statistics."""
-        import emoji
-
         date_from = timezone.now().date() - timedelta(days=days)
         messages = self.get_messages_queryset(chat_id=chat_id, date_from=date_from)
 
+        emoji_pattern = _get_emoji_pattern()
+        if emoji_pattern is None:
+            return []
+
         emoji_counter = Counter()
+        findall = emoji_pattern.findall
 
-        for text in messages.exclude(text='').values_list('text', flat=True):
-            if text:
-                emojis = [c for c in text if c in emoji.EMOJI_DATA]
-                emoji_counter.update(emojis)
+        for batch in self.iter_text_batches(messages):
+            emoji_counter.update(findall('\n'.join(batch)))
 
         return emoji_counter.most_common(limit)
 
     def get_link_stats(self, chat_id=None, days=30):
         """Get statistics about shared links."""
-        import re
-
         date_from = timezone.now().date() - timedelta(days=days)
         messages = self.get_messages_queryset(chat_id=chat_id, date_from=date_from)
 
-        url_pattern = re.compile(r'https?://[^\s<>"{}|\\^`\[\]]+')
+        if connection.vendor == 'postgresql':
+            return self._get_link_stats_sql(messages)
+
         domain_counter = Counter()
         total_links = 0
 
-        for text in messages.exclude(text='').values_list('text', flat=True):
-            if text:
-                urls = url_pattern.findall(text)
-                for url in urls:
-                    total_links += 1
-                    try:
-                        from urllib.parse import urlparse
-                        domain = urlparse(url).netloc
-                        domain_counter[domain] += 1
-                    except:
-                        pass
+        for batch in self.iter_text_batches(messages):
+            for url in URL_PATTERN.findall('\n'.join(batch)):
+                total_links += 1
+                domain_counter[urlparse(url).netloc] += 1
 
         return {
             'total_links': total_links,
             'top_domains': domain_counter.most_common(20),
         }
 
+    def _get_link_stats_sql(self, messages):
+        """Count links and top domains inside Postgres with regexp_matches."""
+        inner_sql, params = messages.exclude(text='').order_by().values('text').query.sql_with_params()
+        sql = (
+            "SELECT m[1] AS domain, COUNT(*) AS n, SUM(COUNT(*)) OVER () AS total "
+            f"FROM ({inner_sql}) AS t, LATERAL regexp_matches(t.text, %s, 'g') AS m "
+            "GROUP BY m[1] ORDER BY n DESC LIMIT 20"
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [*params, URL_DOMAIN_SQL_PATTERN])
+            rows = cursor.fetchall()
+
+        return {
+            'total_links': int(rows[0][2]) if rows else 0,
+            'top_domains': [(domain, n) for domain, n, _ in rows],
+        }
+
+    def get_text_analytics(self, chat_id=None, days=30, word_limit=100, min_word_length=3, emoji_limit=20):
+        """
+        Compute word, emoji, link and message length statistics in one pass.
+
+        Pages rendering several text panels at once should use this instead of
+        the individual methods, which each stream the message texts again.
+        """
+        date_from = timezone.now().date() - timedelta(days=days)
+        messages = self.get_messages_queryset(chat_id=chat_id, date_from=date_from)
+
+        word_counter = Counter()
+        emoji_counter = Counter()
+        domain_counter = Counter()
+        total_links = 0
 
-# Import models at the end to avoid circular imports
-from django.db import models
+        length_ranges = self.LENGTH_RANGES
+        upper_bounds = [max_len for _, max_len, _ in length_ranges]
+        bucket_counts = [0] * len(length_ranges)
+        total_length = 0
+        text_count = 0
+
+        stop_words = self.STOP_WORDS
+        emoji_pattern = _get_emoji_pattern()
+
+        for batch in self.iter_text_batches(messages):
+            joined = '\n'.join(batch)
+
+            words = WORD_PATTERN.findall(joined.lower())
+            word_counter.update(w for w in words if len(w) >= min_word_length and w not in stop_words)
+
+            if emoji_pattern is not None:
+                emoji_counter.update(emoji_pattern.findall(joined))
+
+            for url in URL_PATTERN.findall(joined):
+                total_links += 1
+                domain_counter[urlparse(url).netloc] += 1
+
+            for length in map(len, batch):
+                bucket = bisect.bisect_left(upper_bounds, length)
+                if bucket < len(bucket_counts):
+                    bucket_counts[bucket] += 1
+                total_length += length
+            text_count += len(batch)
+
+        return {
+            'word_frequency': word_counter.most_common(word_limit),
+            'emoji_stats': emoji_counter.most_common(emoji_limit),
+            'link_stats': {
+                'total_links': total_links,
+                'top_domains': domain_counter.most_common(20),
+            },
+            'message_length_stats': {
+                'distribution': [
+                    {'label': label, 'count': count}
+                    for (_, _, label), count in zip(length_ranges, bucket_counts)
+                ],
+                'average_length': round(total_length / text_count, 1) if text_count else 0,
+            },
+        }
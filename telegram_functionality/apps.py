@@ -3,3 +3,13 @@ from django.apps import AppConfig
 
 class TelegramFunctionalityConfig(AppConfig):
     name = 'telegram_functionality'
+
+    def ready(self):
+        from telegram_analyzer_app.logging_utils import install_async_handlers
+        install_async_handlers()
+
+        from django.db.models.signals import post_delete, post_save
+        from .forms import invalidate_chat_choices
+        from .models import TelegramChat
+        post_save.connect(invalidate_chat_choices, sender=TelegramChat)
+        post_delete.connect(invalidate_chat_choices, sender=TelegramChat)
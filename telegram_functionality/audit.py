@@ -0,0 +1,104 @@
+"""
+Background writer for audit log entries.
+
+Views hand AuditLog rows to ``audit_writer`` instead of inserting them on the
+request path; a daemon thread inserts them in batches with ``bulk_create``.
+"""
+import atexit
+import logging
+import queue
+import threading
+import time
+
+from django.db import close_old_connections, connection
+
+from .models import AuditLog
+
+logger = logging.getLogger('telegram_functionality.audit')
+
+
+class AuditLogWriter:
+    """Buffer AuditLog rows and insert them from a background thread in batches."""
+
+    # Maximum rows per INSERT
+    BATCH_SIZE = 500
+    # Seconds to keep collecting rows after the first one of a batch arrives
+    FLUSH_INTERVAL = 1.0
+    # Seconds to wait at exit for the remaining rows to be written
+    STOP_TIMEOUT = 10.0
+
+    # Queued after the last entry to make the writer thread exit
+    _STOP = object()
+
+    def __init__(self):
+        self._queue = queue.SimpleQueue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def enqueue(self, entry):
+        """Queue an unsaved AuditLog for insertion."""
+        self._queue.put(entry)
+        if self._thread is None:
+            self._start()
+
+    def stop(self):
+        """Write every queued entry and stop the writer thread; runs at interpreter exit."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(self._STOP)
+            thread.join(self.STOP_TIMEOUT)
+
+    def _start(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='audit_log_writer', daemon=True)
+                self._thread.start()
+                atexit.register(self.stop)
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            batch = []
+            entry = self._queue.get()
+            deadline = time.monotonic() + self.FLUSH_INTERVAL
+            while True:
+                if entry is self._STOP:
+                    stopping = True
+                    break
+                batch.append(entry)
+                if len(batch) >= self.BATCH_SIZE:
+                    break
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    entry = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+            if batch:
+                self._write(batch)
+
+    def _write(self, batch):
+        # This thread never finishes a request, so expire its connection by
+        # hand: a connection past CONN_MAX_AGE or broken is replaced here
+        close_old_connections()
+        try:
+            AuditLog.objects.bulk_create(batch)
+            return
+        except Exception:
+            logger.warning("Batch insert of %d audit log entries failed, retrying one by one", len(batch), exc_info=True)
+            # Drop a possibly broken connection so the retries reconnect
+            connection.close()
+        finally:
+            close_old_connections()
+
+        # One bad row (e.g. a message deleted meanwhile) must not lose the rest
+        for entry in batch:
+            try:
+                entry.save()
+            except Exception:
+                logger.error("Dropped audit log entry %r for user %s", entry.action, entry.user_id, exc_info=True)
+
+
+audit_writer = AuditLogWriter()
@@ -1,6 +1,32 @@
+import time
+
 from django import forms
 from .models import TelegramChat
 
+# Seconds the per-session chat filter choices are reused between form instances
+CHAT_CHOICES_TTL = 300
+
+_chat_choices_cache = {}
+
+
+def get_chat_choices(session):
+    """Return the chat filter choices of a session, cached for CHAT_CHOICES_TTL seconds."""
+    now = time.monotonic()
+    cached = _chat_choices_cache.get(session.pk)
+    if cached and cached[0] > now:
+        return cached[1]
+
+    chats = TelegramChat.objects.filter(session=session).order_by('title').values_list('chat_id', 'title')
+    chat_choices = [('', 'All Chats')]
+    chat_choices += [(str(chat_id), title) for chat_id, title in chats]
+    _chat_choices_cache[session.pk] = (now + CHAT_CHOICES_TTL, chat_choices)
+    return chat_choices
+
+
+def invalidate_chat_choices(sender, instance, **kwargs):
+    """Signal receiver dropping the cached chat choices of a chat's session."""
+    _chat_choices_cache.pop(instance.session_id, None)
+
 
 class PhoneNumberForm(forms.Form):
     """Form for entering phone number."""
@@ -195,7 +221,4 @@ class AdvancedSearchForm(forms.Form):
         super().__init__(*args, **kwargs)
         # Populate chat choices from session
         if session:
-            chats = TelegramChat.objects.filter(session=session).order_by('title')
-            chat_choices = [('', 'All Chats')]
-            chat_choices += [(str(chat.chat_id), chat.title) for chat in chats]
-            self.fields['chat_id'].choices = chat_choices
+            self.fields['chat_id'].choices = get_chat_choices(session)
@@ -0,0 +1,63 @@
+# Generated by Django 6.0 on 2026-10-16 12:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Q
+from django.db.models.functions import TruncDate
+
+
+def backfill_daily_rollups(apps, schema_editor):
+    TelegramMessage = apps.get_model('telegram_functionality', 'TelegramMessage')
+    MessageDailyRollup = apps.get_model('telegram_functionality', 'MessageDailyRollup')
+
+    rows = TelegramMessage.objects.annotate(
+        day=TruncDate('date')
+    ).values('chat_id', 'chat__session_id', 'day').annotate(
+        count=Count('id'),
+        outgoing=Count('id', filter=Q(is_outgoing=True)),
+        incoming=Count('id', filter=Q(is_outgoing=False)),
+        deleted=Count('id', filter=Q(is_deleted=True)),
+        media_count=Count('id', filter=Q(has_media=True)),
+    ).order_by()
+
+    MessageDailyRollup.objects.bulk_create(
+        (
+            MessageDailyRollup(
+                session_id=row.pop('chat__session_id'),
+                **row,
+            )
+            for row in rows.iterator(chunk_size=2000)
+        ),
+        batch_size=2000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('telegram_functionality', '0008_synctask_synced_users'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MessageDailyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('count', models.IntegerField(default=0)),
+                ('outgoing', models.IntegerField(default=0)),
+                ('incoming', models.IntegerField(default=0)),
+                ('deleted', models.IntegerField(default=0)),
+                ('media_count', models.IntegerField(default=0)),
+                ('chat', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_rollups', to='telegram_functionality.telegramchat')),
+                ('session', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_rollups', to='telegram_functionality.telegramsession')),
+            ],
+            options={
+                'verbose_name': 'Message Daily Rollup',
+                'verbose_name_plural': 'Message Daily Rollups',
+                'indexes': [models.Index(fields=['session', 'day'], name='telegram_fu_session_acbf21_idx')],
+                'unique_together': {('chat', 'day')},
+            },
+        ),
+        migrations.RunPython(backfill_daily_rollups, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 6.0 on 2026-10-16 14:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('telegram_functionality', '0009_messagedailyrollup'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='telegrammessage',
+            index=models.Index(fields=['chat', 'date'], name='telegram_fu_chat_id_202772_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='telegrammessage',
+            index=models.Index(fields=['chat', 'is_deleted'], name='telegram_fu_chat_id_d47175_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='telegrammessage',
+            index=models.Index(fields=['chat', 'has_media'], name='telegram_fu_chat_id_b37ffb_idx'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 6.0 on 2026-10-16 14:40
+
+import django.core.serializers.json
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('telegram_functionality', '0010_telegrammessage_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='analyticscache',
+            name='cache_key',
+            field=models.CharField(blank=True, default='', max_length=32),
+        ),
+        migrations.AlterField(
+            model_name='analyticscache',
+            name='cache_type',
+            field=models.CharField(choices=[('daily_stats', 'Daily Statistics'), ('hourly_activity', 'Hourly Activity'), ('top_senders', 'Top Senders'), ('word_frequency', 'Word Frequency'), ('media_stats', 'Media Statistics'), ('overview', 'Overview'), ('weekly_activity', 'Weekly Activity'), ('activity_heatmap', 'Activity Heatmap'), ('top_chats', 'Top Chats'), ('chat_types', 'Chat Type Distribution'), ('message_lengths', 'Message Lengths')], max_length=50),
+        ),
+        migrations.AlterField(
+            model_name='analyticscache',
+            name='data',
+            field=models.JSONField(default=dict, encoder=django.core.serializers.json.DjangoJSONEncoder),
+        ),
+        migrations.AlterUniqueTogether(
+            name='analyticscache',
+            unique_together={('session', 'cache_type', 'cache_key')},
+        ),
+    ]
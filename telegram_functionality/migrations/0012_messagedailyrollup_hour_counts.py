@@ -0,0 +1,41 @@
+# Generated by Django 6.0 on 2026-10-16 15:10
+
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import ExtractHour, TruncDate
+
+
+def backfill_hour_counts(apps, schema_editor):
+    TelegramMessage = apps.get_model('telegram_functionality', 'TelegramMessage')
+    MessageDailyRollup = apps.get_model('telegram_functionality', 'MessageDailyRollup')
+
+    hourly = TelegramMessage.objects.annotate(
+        day=TruncDate('date'),
+        hour=ExtractHour('date'),
+    ).values_list('chat_id', 'day', 'hour').annotate(count=Count('id')).order_by()
+
+    hour_counts = {}
+    for chat_id, day, hour, count in hourly.iterator(chunk_size=2000):
+        hour_counts.setdefault((chat_id, day), [0] * 24)[hour] = count
+
+    rollups = []
+    for rollup in MessageDailyRollup.objects.iterator(chunk_size=2000):
+        rollup.hour_counts = hour_counts.get((rollup.chat_id, rollup.day), [0] * 24)
+        rollups.append(rollup)
+    MessageDailyRollup.objects.bulk_update(rollups, ['hour_counts'], batch_size=2000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('telegram_functionality', '0011_analyticscache_cache_key'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='messagedailyrollup',
+            name='hour_counts',
+            field=models.JSONField(default=list),
+        ),
+        migrations.RunPython(backfill_hour_counts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 6.0 on 2026-10-16 16:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('telegram_functionality', '0012_messagedailyrollup_hour_counts'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='telegrammessage',
+            index=models.Index(fields=['chat', 'sender_id', '-date'], name='telegram_fu_chat_id_f104ea_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='telegrammessage',
+            index=models.Index(condition=models.Q(('is_deleted', True)), fields=['-deleted_at'], name='telegram_msg_deleted_at_idx'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 6.0 on 2026-10-16 16:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('telegram_functionality', '0013_telegrammessage_sender_and_deleted_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='mediahash',
+            name='file_hash',
+            field=models.CharField(blank=True, max_length=64, null=True),
+        ),
+        migrations.AlterField(
+            model_name='mediahash',
+            name='perceptual_hash',
+            field=models.CharField(blank=True, max_length=64, null=True),
+        ),
+    ]
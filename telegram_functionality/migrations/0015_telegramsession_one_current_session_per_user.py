@@ -0,0 +1,33 @@
+# Generated by Django 6.0 on 2026-10-16 17:30
+
+from django.db import migrations, models
+
+
+def clear_extra_current_sessions(apps, schema_editor):
+    TelegramSession = apps.get_model('telegram_functionality', 'TelegramSession')
+
+    seen_users = set()
+    current = TelegramSession.objects.filter(is_current=True).order_by('user_id', '-updated_at', '-pk')
+    extra_pks = []
+    for pk, user_id in current.values_list('pk', 'user_id'):
+        if user_id in seen_users:
+            extra_pks.append(pk)
+        else:
+            seen_users.add(user_id)
+
+    TelegramSession.objects.filter(pk__in=extra_pks).update(is_current=False)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('telegram_functionality', '0014_mediahash_drop_duplicate_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(clear_extra_current_sessions, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='telegramsession',
+            constraint=models.UniqueConstraint(condition=models.Q(('is_current', True)), fields=('user',), name='one_current_session_per_user'),
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 6.0 on 2026-10-16 18:05
+
+from django.db import migrations, models
+from django.db.models import Case, Q, Value, When
+
+
+def backfill_media_kind(apps, schema_editor):
+    TelegramMessage = apps.get_model('telegram_functionality', 'TelegramMessage')
+    TelegramMessage.objects.filter(has_media=True).update(media_kind=Case(
+        When(media_mime_type__startswith='image/', then=Value(1)),
+        When(media_mime_type__startswith='video/', then=Value(2)),
+        When(media_mime_type__startswith='audio/', then=Value(3)),
+        When(
+            Q(media_mime_type__isnull=True) | Q(media_mime_type=''),
+            media_type__in=['MessageMediaPhoto', 'Photo'],
+            then=Value(1),
+        ),
+        default=Value(4),
+    ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('telegram_functionality', '0015_telegramsession_one_current_session_per_user'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='telegrammessage',
+            name='media_kind',
+            field=models.PositiveSmallIntegerField(blank=True, choices=[(1, 'Image'), (2, 'Video'), (3, 'Audio'), (4, 'Document')], null=True),
+        ),
+        migrations.RunPython(backfill_media_kind, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='telegrammessage',
+            index=models.Index(fields=['chat', 'media_kind'], name='telegram_fu_chat_id_9c79d2_idx'),
+        ),
+    ]
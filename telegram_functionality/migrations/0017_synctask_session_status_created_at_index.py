@@ -0,0 +1,17 @@
+# Generated by Django 6.0 on 2026-10-16 18:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('telegram_functionality', '0016_telegrammessage_media_kind'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='synctask',
+            index=models.Index(fields=['session', 'status', 'created_at'], name='telegram_fu_session_2944b2_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 6.0 on 2026-10-16 19:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('telegram_functionality', '0017_synctask_session_status_created_at_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='synctask',
+            name='progress_percent',
+            field=models.GeneratedField(db_persist=True, expression=models.Case(models.When(total_chats=0, then=models.Value(0)), default=models.F('synced_chats') * 100 / models.F('total_chats')), output_field=models.IntegerField()),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 6.0 on 2026-10-16 19:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('telegram_functionality', '0018_synctask_progress_percent'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='telegrammessage',
+            name='telegram_fu_chat_id_d47175_idx',
+        ),
+        migrations.AddIndex(
+            model_name='telegrammessage',
+            index=models.Index(fields=['chat', 'is_deleted', '-date'], name='telegram_fu_chat_id_6f3d3c_idx'),
+        ),
+    ]
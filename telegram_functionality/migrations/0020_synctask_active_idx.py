@@ -0,0 +1,21 @@
+# Generated by Django 6.0 on 2026-10-16 21:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('telegram_functionality', '0019_telegrammessage_chat_is_deleted_date_index'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='synctask',
+            name='telegram_fu_session_2944b2_idx',
+        ),
+        migrations.AddIndex(
+            model_name='synctask',
+            index=models.Index(condition=models.Q(('status__in', ['pending', 'running'])), fields=['session', 'created_at'], name='synctask_active_idx'),
+        ),
+    ]
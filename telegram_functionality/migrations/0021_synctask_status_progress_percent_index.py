@@ -0,0 +1,17 @@
+# Generated by Django 6.0 on 2026-10-16 22:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('telegram_functionality', '0020_synctask_active_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='synctask',
+            index=models.Index(fields=['status', 'progress_percent'], name='telegram_fu_status_f62664_idx'),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 6.0 on 2026-10-16 22:55
+
+from django.db import migrations, models
+from django.db.models import Q
+
+
+def backfill_unknown_media_kind(apps, schema_editor):
+    TelegramMessage = apps.get_model('telegram_functionality', 'TelegramMessage')
+    TelegramMessage.objects.filter(
+        Q(media_mime_type__isnull=True) | Q(media_mime_type=''),
+        has_media=True,
+    ).exclude(
+        media_type__in=['MessageMediaPhoto', 'Photo', 'MessageMediaDocument', 'Document'],
+    ).update(media_kind=5)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('telegram_functionality', '0021_synctask_status_progress_percent_index'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='telegrammessage',
+            name='media_kind',
+            field=models.PositiveSmallIntegerField(blank=True, choices=[(1, 'Image'), (2, 'Video'), (3, 'Audio'), (4, 'Document'), (5, 'Unknown')], null=True),
+        ),
+        migrations.RunPython(backfill_unknown_media_kind, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,101 @@
+# Generated by Django 6.0 on 2026-10-16 23:10
+
+from django.db import migrations, models
+
+
+def _from_hex(value):
+    try:
+        return bytes.fromhex(value) if value else None
+    except ValueError:
+        return None
+
+
+def hex_to_binary(apps, schema_editor):
+    MediaHash = apps.get_model('telegram_functionality', 'MediaHash')
+    batch = []
+    rows = MediaHash.objects.exclude(file_hash__isnull=True, perceptual_hash__isnull=True).only(
+        'file_hash', 'perceptual_hash'
+    )
+    for media_hash in rows.iterator(chunk_size=2000):
+        media_hash.file_hash_raw = _from_hex(media_hash.file_hash)
+        media_hash.perceptual_hash_raw = _from_hex(media_hash.perceptual_hash)
+        batch.append(media_hash)
+        if len(batch) >= 2000:
+            MediaHash.objects.bulk_update(batch, ['file_hash_raw', 'perceptual_hash_raw'])
+            batch = []
+    if batch:
+        MediaHash.objects.bulk_update(batch, ['file_hash_raw', 'perceptual_hash_raw'])
+
+
+def binary_to_hex(apps, schema_editor):
+    MediaHash = apps.get_model('telegram_functionality', 'MediaHash')
+    batch = []
+    rows = MediaHash.objects.exclude(file_hash_raw__isnull=True, perceptual_hash_raw__isnull=True).only(
+        'file_hash_raw', 'perceptual_hash_raw'
+    )
+    for media_hash in rows.iterator(chunk_size=2000):
+        media_hash.file_hash = bytes(media_hash.file_hash_raw).hex() if media_hash.file_hash_raw else None
+        media_hash.perceptual_hash = (
+            bytes(media_hash.perceptual_hash_raw).hex() if media_hash.perceptual_hash_raw else None
+        )
+        batch.append(media_hash)
+        if len(batch) >= 2000:
+            MediaHash.objects.bulk_update(batch, ['file_hash', 'perceptual_hash'])
+            batch = []
+    if batch:
+        MediaHash.objects.bulk_update(batch, ['file_hash', 'perceptual_hash'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('telegram_functionality', '0022_telegrammessage_media_kind_unknown'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='mediahash',
+            name='telegram_fu_file_ha_d8718e_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='mediahash',
+            name='telegram_fu_percept_6bcc6e_idx',
+        ),
+        migrations.AddField(
+            model_name='mediahash',
+            name='file_hash_raw',
+            field=models.BinaryField(blank=True, max_length=32, null=True),
+        ),
+        migrations.AddField(
+            model_name='mediahash',
+            name='perceptual_hash_raw',
+            field=models.BinaryField(blank=True, max_length=8, null=True),
+        ),
+        migrations.RunPython(hex_to_binary, binary_to_hex),
+        migrations.RemoveField(
+            model_name='mediahash',
+            name='file_hash',
+        ),
+        migrations.RemoveField(
+            model_name='mediahash',
+            name='perceptual_hash',
+        ),
+        migrations.RenameField(
+            model_name='mediahash',
+            old_name='file_hash_raw',
+            new_name='file_hash',
+        ),
+        migrations.RenameField(
+            model_name='mediahash',
+            old_name='perceptual_hash_raw',
+            new_name='perceptual_hash',
+        ),
+        migrations.AddIndex(
+            model_name='mediahash',
+            index=models.Index(fields=['file_hash'], name='telegram_fu_file_ha_d8718e_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='mediahash',
+            index=models.Index(fields=['perceptual_hash'], name='telegram_fu_percept_6bcc6e_idx'),
+        ),
+    ]
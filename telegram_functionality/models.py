@@ -1,8 +1,28 @@
-from django.db import models
+from django.db import IntegrityError, connection, models, transaction
+from django.db.models import Case, Count, F, Q, Value, When
+from django.db.models.functions import Concat, ExtractHour, TruncDate
 from django.conf import settings
+from django.utils import timezone
+from django.core.serializers.json import DjangoJSONEncoder
 from cryptography.fernet import Fernet
 import base64
+import functools
 import hashlib
+import time
+from itertools import batched
+
+
+@functools.lru_cache(maxsize=2)
+def _get_fernet(secret_key):
+    """Build the session-string cipher for a secret key (once per process and key)."""
+    key = hashlib.sha256(secret_key.encode()).digest()
+    return Fernet(base64.urlsafe_b64encode(key))
+
+
+@functools.lru_cache(maxsize=512)
+def _decrypt_session_string(ciphertext, secret_key):
+    """Decrypt a stored session string; keyed by ciphertext, so re-encrypting yields a new entry."""
+    return _get_fernet(secret_key).decrypt(ciphertext.encode()).decode()
 
 
 class TelegramSession(models.Model):
@@ -29,6 +49,13 @@ class TelegramSession(models.Model):
         verbose_name = 'Telegram Session'
         verbose_name_plural = 'Telegram Sessions'
         unique_together = ['user', 'phone_number']  # One phone number per user
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user'],
+                condition=Q(is_current=True),
+                name='one_current_session_per_user',
+            ),
+        ]
 
     def __str__(self):
         name = self.display_name or self.telegram_username or self.phone_number
@@ -49,29 +76,32 @@ class TelegramSession(models.Model):
 
     def set_as_current(self):
         """Set this session as the current active session for the user."""
-        # Unset current from all other sessions for this user
-        TelegramSession.objects.filter(user=self.user, is_current=True).update(is_current=False)
+        # Flag this session and unset all others for the user in one UPDATE;
+        # it locks all of the user's rows, so concurrent switches serialize
+        try:
+            with transaction.atomic():
+                TelegramSession.objects.filter(user_id=self.user_id).update(
+                    is_current=Case(When(pk=self.pk, then=Value(True)), default=Value(False))
+                )
+        except IntegrityError:
+            # PostgreSQL checks the one_current_session_per_user index row by
+            # row, so the UPDATE fails if it reaches this session before the
+            # previous current one; clearing that one first always succeeds
+            with transaction.atomic():
+                TelegramSession.objects.filter(user_id=self.user_id).exclude(pk=self.pk).update(is_current=False)
+                TelegramSession.objects.filter(pk=self.pk).update(is_current=True)
         self.is_current = True
-        self.save(update_fields=['is_current'])
-
-    def _get_encryption_key(self):
-        """Generate encryption key from Django secret key."""
-        key = hashlib.sha256(settings.SECRET_KEY.encode()).digest()
-        return base64.urlsafe_b64encode(key)
 
     def set_session_string(self, session_string):
         """Encrypt and store session string."""
         if session_string:
-            fernet = Fernet(self._get_encryption_key())
-            encrypted = fernet.encrypt(session_string.encode())
+            encrypted = _get_fernet(settings.SECRET_KEY).encrypt(session_string.encode())
             self.session_string = encrypted.decode()
 
     def get_session_string(self):
         """Decrypt and return session string."""
         if self.session_string:
-            fernet = Fernet(self._get_encryption_key())
-            decrypted = fernet.decrypt(self.session_string.encode())
-            return decrypted.decode()
+            return _decrypt_session_string(self.session_string, settings.SECRET_KEY)
         return None
 
 
@@ -111,6 +141,18 @@ class TelegramChat(models.Model):
         return f"{self.title} ({self.chat_type})"
 
 
+class SyncTaskQuerySet(models.QuerySet):
+    def active(self):
+        """Tasks that are queued or running."""
+        return self.filter(status__in=['pending', 'running'])
+
+    def running(self):
+        return self.filter(status='running')
+
+    def finished(self):
+        return self.filter(status__in=SyncTask.FINISHED_STATUSES)
+
+
 class SyncTask(models.Model):
     """Model to track background sync tasks and their progress."""
 
@@ -128,6 +170,17 @@ class SyncTask(models.Model):
         ('check_deleted', 'Check Deleted Messages'),
     ]
 
+    FINISHED_STATUSES = ['completed', 'failed', 'cancelled']
+
+    # Fields written by flush_progress() while a sync runs
+    PROGRESS_FIELDS = [
+        'total_chats', 'synced_chats', 'total_messages', 'synced_messages',
+        'new_messages', 'synced_users', 'current_chat_id', 'current_chat_title',
+        'current_chat_progress',
+    ]
+    # Minimum seconds between unforced progress writes
+    PROGRESS_FLUSH_INTERVAL = 0.5
+
     session = models.ForeignKey(
         TelegramSession,
         on_delete=models.CASCADE,
@@ -143,6 +196,15 @@ class SyncTask(models.Model):
     synced_messages = models.IntegerField(default=0)
     new_messages = models.IntegerField(default=0)
     synced_users = models.IntegerField(default=0)
+    # Overall progress, computed by the database from synced_chats/total_chats
+    progress_percent = models.GeneratedField(
+        expression=Case(
+            When(total_chats=0, then=Value(0)),
+            default=F('synced_chats') * 100 / F('total_chats'),
+        ),
+        output_field=models.IntegerField(),
+        db_persist=True,
+    )
 
     # Current activity
     current_chat_id = models.BigIntegerField(null=True, blank=True)
@@ -160,27 +222,66 @@ class SyncTask(models.Model):
     # Log of activities
     log = models.TextField(blank=True, default='')
 
+    objects = SyncTaskQuerySet.as_manager()
+
     class Meta:
         verbose_name = 'Sync Task'
         verbose_name_plural = 'Sync Tasks'
         ordering = ['-created_at']
+        indexes = [
+            # Only queued and running tasks are looked up by status, so
+            # finished history stays out of the index
+            models.Index(
+                fields=['session', 'created_at'],
+                condition=Q(status__in=['pending', 'running']),
+                name='synctask_active_idx',
+            ),
+            # Task lists filtered by status and sorted by progress
+            models.Index(fields=['status', 'progress_percent']),
+        ]
 
     def __str__(self):
         return f"{self.get_task_type_display()} - {self.status} ({self.created_at})"
 
+    @classmethod
+    def claim_next(cls, session, task_id=None):
+        """
+        Mark the oldest pending task of a session (or the given one) as running.
+
+        Rows locked by another worker are skipped, so each task is claimed by
+        at most one worker. Returns None when there is nothing to claim.
+        """
+        with transaction.atomic():
+            tasks = cls.objects.select_for_update(skip_locked=True).filter(session=session, status='pending')
+            if task_id is not None:
+                tasks = tasks.filter(pk=task_id)
+            task = tasks.order_by('created_at').first()
+            if task is not None:
+                task.status = 'running'
+                task.started_at = timezone.now()
+                task.save(update_fields=['status', 'started_at'])
+        return task
+
     def add_log(self, message):
         """Add a log entry with timestamp."""
-        from django.utils import timezone
-        timestamp = timezone.now().strftime('%H:%M:%S')
-        self.log += f"[{timestamp}] {message}\n"
-        self.save(update_fields=['log'])
-
-    @property
-    def progress_percent(self):
-        """Calculate overall progress percentage."""
-        if self.total_chats == 0:
-            return 0
-        return int((self.synced_chats / self.total_chats) * 100)
+        now = timezone.now()
+        entry = f"[{now.hour:02d}:{now.minute:02d}:{now.second:02d}] {message}\n"
+        # Append in the database so only the new line is sent, and mirror it
+        # locally so a later full save() does not write back a stale log
+        SyncTask.objects.filter(pk=self.pk).update(log=Concat('log', Value(entry)))
+        self.log += entry
+
+    def flush_progress(self, force=False):
+        """
+        Write the progress counters, at most once per PROGRESS_FLUSH_INTERVAL
+        unless force is set. Only PROGRESS_FIELDS are sent, not the log.
+        """
+        now = time.monotonic()
+        if not force and now - getattr(self, '_last_progress_flush', float('-inf')) < self.PROGRESS_FLUSH_INTERVAL:
+            return False
+        SyncTask.objects.filter(pk=self.pk).update(**{field: getattr(self, field) for field in self.PROGRESS_FIELDS})
+        self._last_progress_flush = now
+        return True
 
     @property
     def is_running(self):
@@ -188,7 +289,8 @@ class SyncTask(models.Model):
 
     @property
     def is_finished(self):
-        return self.status in ['completed', 'failed', 'cancelled']
+        # Instance check; use SyncTask.objects.finished() to filter in SQL
+        return self.status in self.FINISHED_STATUSES
 
 
 def telegram_media_path(instance, filename):
@@ -199,9 +301,157 @@ def telegram_media_path(instance, filename):
     return f'telegram_media/{user_id}/{chat_id}/{instance.message_id}/{filename}'
 
 
+class TelegramMessageQuerySet(models.QuerySet):
+    def with_context(self):
+        """Join the chat and session each message belongs to."""
+        return self.select_related('chat', 'chat__session')
+
+    def stream(self):
+        """Iterate in chunks without caching rows; uses a server-side cursor on PostgreSQL."""
+        return self.iterator(chunk_size=2000)
+
+
+class TelegramMessageManager(models.Manager.from_queryset(TelegramMessageQuerySet)):
+    """Manager with bulk helpers for storing messages fetched from Telegram."""
+
+    # Rows per INSERT/UPDATE; keeps statements under PostgreSQL's bind-parameter limit
+    BULK_BATCH_SIZE = 2000
+
+    # Message fields copied verbatim from the fetched message data
+    SYNC_FIELDS = [
+        'text', 'date', 'sender_id', 'sender_name', 'is_outgoing', 'has_media',
+        'media_type', 'reply_to_msg_id', 'forwards', 'views',
+    ]
+    MEDIA_FIELDS = [
+        'media_file', 'media_file_name', 'media_file_size', 'media_mime_type',
+        'media_width', 'media_height', 'media_duration', 'media_kind',
+    ]
+
+    def build_from_sync(self, chat, msg_data, pk=None):
+        """Build an unsaved message from fetched message data, including downloaded media."""
+        msg = self.model(
+            pk=pk,
+            chat=chat,
+            message_id=msg_data['id'],
+            **{field: msg_data[field] for field in self.SYNC_FIELDS},
+        )
+        msg.media_file = msg_data.get('media_file_path')
+        for field in self.MEDIA_FIELDS[1:-1]:
+            setattr(msg, field, msg_data.get(field))
+        msg.media_kind = self.model.classify_media(msg.has_media, msg.media_mime_type, msg.media_type)
+        return msg
+
+    def bulk_upsert(self, chat, messages_data):
+        """Insert fetched messages, overwriting the synced fields of ones already stored."""
+        objs = [self.build_from_sync(chat, msg_data) for msg_data in messages_data]
+
+        # media_mime_type is not overwritten on conflict, so messages fetched
+        # without their media are classified by the MIME type already stored
+        missing = [obj.message_id for obj in objs if obj.has_media and not obj.media_mime_type]
+        stored_mimes = {}
+        for batch in batched(missing, self.BULK_BATCH_SIZE):
+            stored_mimes.update(
+                self.filter(chat=chat, message_id__in=batch)
+                .exclude(Q(media_mime_type__isnull=True) | Q(media_mime_type=''))
+                .values_list('message_id', 'media_mime_type')
+            )
+        for obj in objs:
+            if obj.message_id in stored_mimes:
+                obj.media_kind = self.model.classify_media(True, stored_mimes[obj.message_id], obj.media_type)
+
+        with transaction.atomic():
+            self.bulk_create(
+                objs,
+                batch_size=self.BULK_BATCH_SIZE,
+                update_conflicts=True,
+                unique_fields=['chat', 'message_id'],
+                update_fields=self.SYNC_FIELDS + ['media_kind', 'last_seen_at'],
+            )
+        return len(objs)
+
+    def bulk_ingest(self, chat, messages_data):
+        """
+        Insert fetched messages that are not stored yet and attach newly
+        downloaded media to stored messages that have none.
+
+        Returns the data of the inserted messages and the number of stored
+        messages that received media.
+        """
+        stored = {}
+        ids = [msg_data['id'] for msg_data in messages_data]
+        for batch in batched(ids, self.BULK_BATCH_SIZE):
+            rows = self.filter(chat=chat, message_id__in=batch).values_list('message_id', 'pk', 'media_file')
+            stored.update((message_id, (pk, media_file)) for message_id, pk, media_file in rows)
+
+        created = []
+        new_objs = []
+        media_objs = []
+        for msg_data in messages_data:
+            existing = stored.get(msg_data['id'])
+            if existing is None:
+                created.append(msg_data)
+                new_objs.append(self.build_from_sync(chat, msg_data))
+            elif msg_data.get('media_file_path') and not existing[1]:
+                media_objs.append(self.build_from_sync(chat, msg_data, pk=existing[0]))
+
+        with transaction.atomic():
+            self.bulk_create(new_objs, batch_size=self.BULK_BATCH_SIZE, ignore_conflicts=True)
+            if media_objs:
+                self.bulk_update(media_objs, self.MEDIA_FIELDS, batch_size=self.BULK_BATCH_SIZE)
+
+        return created, len(media_objs)
+
+    def mark_missing_deleted(self, chat, telegram_ids):
+        """
+        Mark stored messages of a chat whose ids are not in telegram_ids as
+        deleted. Returns the number of messages marked.
+
+        An empty telegram_ids marks nothing: an empty or failed fetch must
+        not flag the whole chat as deleted.
+        """
+        telegram_ids = list(telegram_ids)
+        if not telegram_ids:
+            return 0
+
+        now = timezone.now()
+        if connection.vendor == 'postgresql':
+            # One statement; the ids travel as a single array parameter
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f"UPDATE {self.model._meta.db_table} SET is_deleted = true, deleted_at = %s "
+                    "WHERE chat_id = %s AND NOT is_deleted AND NOT (message_id = ANY(%s))",
+                    [now, chat.pk, telegram_ids],
+                )
+                return cursor.rowcount
+
+        telegram_ids = set(telegram_ids)
+        stored = self.filter(chat=chat, is_deleted=False).values_list('pk', 'message_id')
+        deleted_pks = [pk for pk, message_id in stored if message_id not in telegram_ids]
+        for batch in batched(deleted_pks, self.BULK_BATCH_SIZE):
+            self.filter(pk__in=batch).update(is_deleted=True, deleted_at=now)
+        return len(deleted_pks)
+
+
 class TelegramMessage(models.Model):
     """Model to store Telegram messages with deletion tracking."""
 
+    MEDIA_IMAGE = 1
+    MEDIA_VIDEO = 2
+    MEDIA_AUDIO = 3
+    MEDIA_DOCUMENT = 4
+    # Media without a MIME type that is neither a photo nor a document
+    # (web page previews, locations, polls, ...)
+    MEDIA_UNKNOWN = 5
+    MEDIA_KINDS = [
+        (MEDIA_IMAGE, 'Image'),
+        (MEDIA_VIDEO, 'Video'),
+        (MEDIA_AUDIO, 'Audio'),
+        (MEDIA_DOCUMENT, 'Document'),
+        (MEDIA_UNKNOWN, 'Unknown'),
+    ]
+    # Kinds listed under "documents", i.e. any media that is not image/video/audio
+    DOCUMENT_KINDS = (MEDIA_DOCUMENT, MEDIA_UNKNOWN)
+
     chat = models.ForeignKey(
         TelegramChat,
         on_delete=models.CASCADE,
@@ -227,6 +477,8 @@ class TelegramMessage(models.Model):
     media_width = models.IntegerField(null=True, blank=True)
     media_height = models.IntegerField(null=True, blank=True)
     media_duration = models.IntegerField(null=True, blank=True)  # seconds for audio/video
+    # Derived from media_mime_type/media_type so media filters hit an index
+    media_kind = models.PositiveSmallIntegerField(choices=MEDIA_KINDS, null=True, blank=True)
 
     # Deletion tracking
     is_deleted = models.BooleanField(default=False)
@@ -236,44 +488,74 @@ class TelegramMessage(models.Model):
     first_seen_at = models.DateTimeField(auto_now_add=True)
     last_seen_at = models.DateTimeField(auto_now=True)
 
+    objects = TelegramMessageManager()
+
     class Meta:
         verbose_name = 'Telegram Message'
         verbose_name_plural = 'Telegram Messages'
         unique_together = ['chat', 'message_id']
         ordering = ['-date']
+        indexes = [
+            models.Index(fields=['chat', 'date']),
+            # Chat timelines hide deleted messages and page by date
+            models.Index(fields=['chat', 'is_deleted', '-date']),
+            models.Index(fields=['chat', 'has_media']),
+            models.Index(fields=['chat', 'sender_id', '-date']),
+            models.Index(fields=['chat', 'media_kind']),
+            # Deleted-message lists are sorted by deletion time across all chats
+            models.Index(
+                fields=['-deleted_at'],
+                condition=Q(is_deleted=True),
+                name='telegram_msg_deleted_at_idx',
+            ),
+        ]
 
     def __str__(self):
         preview = self.text[:50] + '...' if len(self.text) > 50 else self.text
         status = ' [DELETED]' if self.is_deleted else ''
         return f"{self.chat.title}: {preview}{status}"
 
+    def save(self, **kwargs):
+        self.media_kind = self.classify_media(self.has_media, self.media_mime_type, self.media_type)
+        if kwargs.get('update_fields') is not None:
+            kwargs['update_fields'] = {*kwargs['update_fields'], 'media_kind'}
+        super().save(**kwargs)
+
+    @classmethod
+    def classify_media(cls, has_media, mime_type, media_type):
+        """Return the MEDIA_* kind for a message's media, or None without media."""
+        if not has_media:
+            return None
+        if mime_type:
+            for prefix, kind in (('image/', cls.MEDIA_IMAGE), ('video/', cls.MEDIA_VIDEO), ('audio/', cls.MEDIA_AUDIO)):
+                if mime_type.startswith(prefix):
+                    return kind
+            return cls.MEDIA_DOCUMENT
+        if media_type in ('MessageMediaPhoto', 'Photo'):
+            return cls.MEDIA_IMAGE
+        if media_type in ('MessageMediaDocument', 'Document'):
+            return cls.MEDIA_DOCUMENT
+        return cls.MEDIA_UNKNOWN
+
     @property
     def is_image(self):
         """Check if media is an image."""
-        if self.media_mime_type:
-            return self.media_mime_type.startswith('image/')
-        return self.media_type in ['MessageMediaPhoto', 'Photo']
+        return self.media_kind == self.MEDIA_IMAGE
 
     @property
     def is_video(self):
         """Check if media is a video."""
-        if self.media_mime_type:
-            return self.media_mime_type.startswith('video/')
-        return self.media_type in ['MessageMediaDocument'] and self.media_mime_type and 'video' in self.media_mime_type
+        return self.media_kind == self.MEDIA_VIDEO
 
     @property
     def is_audio(self):
         """Check if media is audio."""
-        if self.media_mime_type:
-            return self.media_mime_type.startswith('audio/')
-        return False
+        return self.media_kind == self.MEDIA_AUDIO
 
     @property
     def is_document(self):
         """Check if media is a document (not image/video/audio)."""
-        if not self.has_media or not self.media_file:
-            return False
-        return not (self.is_image or self.is_video or self.is_audio)
+        return self.media_kind in self.DOCUMENT_KINDS and bool(self.media_file)
 
 
 # ============================================
@@ -285,6 +567,92 @@ def user_photo_path(instance, filename):
     return f'telegram_users/{instance.user_id}/{filename}'
 
 
+class TelegramUserManager(models.Manager):
+    """Manager with a bulk helper for storing chat participants fetched from Telegram."""
+
+    BULK_BATCH_SIZE = 1000
+
+    # User fields refreshed from the fetched participant data
+    PARTICIPANT_FIELDS = [
+        'username', 'first_name', 'last_name', 'phone', 'is_bot', 'is_verified',
+        'is_premium', 'is_scam', 'is_fake', 'is_deleted', 'status', 'last_online',
+    ]
+    MEMBERSHIP_FIELDS = ['role', 'admin_title', 'admin_rights', 'is_member']
+
+    def bulk_sync_participants(self, session, chat, participants):
+        """
+        Insert or update the participants of a chat and their memberships.
+
+        Returns the Telegram user ids of newly created users and of users
+        that were not members of the chat before.
+        """
+        participants = list({p['user_id']: p for p in participants}.values())
+        ids = [p['user_id'] for p in participants]
+
+        existing_users = set()
+        for batch in batched(ids, self.BULK_BATCH_SIZE):
+            existing_users.update(self.filter(session=session, user_id__in=batch).values_list('user_id', flat=True))
+
+        users = [
+            self.model(
+                session=session,
+                user_id=p['user_id'],
+                username=p.get('username'),
+                first_name=p.get('first_name'),
+                last_name=p.get('last_name'),
+                phone=p.get('phone'),
+                is_bot=p.get('is_bot', False),
+                is_verified=p.get('is_verified', False),
+                is_premium=p.get('is_premium', False),
+                is_scam=p.get('is_scam', False),
+                is_fake=p.get('is_fake', False),
+                is_deleted=p.get('is_deleted', False),
+                status=p.get('status'),
+                last_online=p.get('last_online'),
+                photo_id=p.get('photo_id'),
+            )
+            for p in participants
+        ]
+
+        with transaction.atomic():
+            self.bulk_create(
+                users,
+                batch_size=self.BULK_BATCH_SIZE,
+                update_conflicts=True,
+                unique_fields=['session', 'user_id'],
+                update_fields=self.PARTICIPANT_FIELDS + ['last_updated'],
+            )
+
+            pks = {}
+            existing_members = set()
+            for batch in batched(ids, self.BULK_BATCH_SIZE):
+                pks.update(self.filter(session=session, user_id__in=batch).values_list('user_id', 'pk'))
+                existing_members.update(ChatMembership.objects.filter(
+                    chat=chat, telegram_user__session=session, telegram_user__user_id__in=batch,
+                ).values_list('telegram_user__user_id', flat=True))
+
+            memberships = [
+                ChatMembership(
+                    telegram_user_id=pks[p['user_id']],
+                    chat=chat,
+                    role=p.get('role', 'member'),
+                    admin_title=p.get('admin_title'),
+                    admin_rights=p.get('admin_rights', {}),
+                    is_member=True,
+                )
+                for p in participants
+            ]
+            ChatMembership.objects.bulk_create(
+                memberships,
+                batch_size=self.BULK_BATCH_SIZE,
+                update_conflicts=True,
+                unique_fields=['telegram_user', 'chat'],
+                update_fields=self.MEMBERSHIP_FIELDS + ['last_updated'],
+            )
+
+        return set(ids) - existing_users, set(ids) - existing_members
+
+
 class TelegramUser(models.Model):
     """Model to store Telegram users seen in chats."""
 
@@ -322,6 +690,8 @@ class TelegramUser(models.Model):
     first_seen_at = models.DateTimeField(auto_now_add=True)
     last_updated = models.DateTimeField(auto_now=True)
 
+    objects = TelegramUserManager()
+
     class Meta:
         verbose_name = 'Telegram User'
         verbose_name_plural = 'Telegram Users'
@@ -630,6 +1000,12 @@ class KeywordAlert(models.Model):
         return f"Alert: {self.keyword}"
 
 
+class AlertTriggerQuerySet(models.QuerySet):
+    def with_context(self):
+        """Join the alert and the triggering message with its chat."""
+        return self.select_related('alert', 'message', 'message__chat')
+
+
 class AlertTrigger(models.Model):
     """Log of triggered alerts."""
 
@@ -646,6 +1022,8 @@ class AlertTrigger(models.Model):
     triggered_at = models.DateTimeField(auto_now_add=True)
     notified = models.BooleanField(default=False)
 
+    objects = AlertTriggerQuerySet.as_manager()
+
     class Meta:
         ordering = ['-triggered_at']
 
@@ -758,6 +1136,12 @@ class BackupHistory(models.Model):
 # Audit Log
 # ============================================
 
+class AuditLogQuerySet(models.QuerySet):
+    def with_context(self):
+        """Join the session, chat and message an entry refers to."""
+        return self.select_related('session', 'chat', 'message')
+
+
 class AuditLog(models.Model):
     """Audit log for tracking user actions."""
 
@@ -815,6 +1199,8 @@ class AuditLog(models.Model):
     metadata = models.JSONField(default=dict, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    objects = AuditLogQuerySet.as_manager()
+
     class Meta:
         verbose_name = 'Audit Log'
         verbose_name_plural = 'Audit Logs'
@@ -841,9 +1227,10 @@ class MediaHash(models.Model):
         related_name='media_hash'
     )
 
-    # Different hash types for comparison
-    file_hash = models.CharField(max_length=64, blank=True, null=True, db_index=True)  # MD5/SHA256
-    perceptual_hash = models.CharField(max_length=64, blank=True, null=True, db_index=True)  # pHash for images
+    # Different hash types for comparison, stored as raw digests
+    # Indexed through Meta.indexes
+    file_hash = models.BinaryField(max_length=32, blank=True, null=True)  # MD5/SHA256
+    perceptual_hash = models.BinaryField(max_length=8, blank=True, null=True)  # pHash for images
 
     file_size = models.BigIntegerField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
@@ -870,6 +1257,12 @@ class AnalyticsCache(models.Model):
         ('top_senders', 'Top Senders'),
         ('word_frequency', 'Word Frequency'),
         ('media_stats', 'Media Statistics'),
+        ('overview', 'Overview'),
+        ('weekly_activity', 'Weekly Activity'),
+        ('activity_heatmap', 'Activity Heatmap'),
+        ('top_chats', 'Top Chats'),
+        ('chat_types', 'Chat Type Distribution'),
+        ('message_lengths', 'Message Lengths'),
     ]
 
     session = models.ForeignKey(
@@ -878,7 +1271,9 @@ class AnalyticsCache(models.Model):
         related_name='analytics_cache'
     )
     cache_type = models.CharField(max_length=50, choices=CACHE_TYPES)
-    data = models.JSONField(default=dict)
+    # Digest of the call arguments the cached data was computed for
+    cache_key = models.CharField(max_length=32, blank=True, default='')
+    data = models.JSONField(default=dict, encoder=DjangoJSONEncoder)
 
     # Time range this cache covers
     date_from = models.DateField(null=True, blank=True)
@@ -890,4 +1285,90 @@ class AnalyticsCache(models.Model):
     class Meta:
         verbose_name = 'Analytics Cache'
         verbose_name_plural = 'Analytics Caches'
-        unique_together = ['session', 'cache_type', 'date_from', 'date_to']
+        unique_together = ['session', 'cache_type', 'cache_key']
+
+    @classmethod
+    def invalidate(cls, session_id):
+        """Drop all cached analytics of a session."""
+        cls.objects.filter(session_id=session_id).delete()
+
+
+class MessageDailyRollup(models.Model):
+    """Pre-aggregated per-chat daily message counts used by the analytics dashboards."""
+
+    session = models.ForeignKey(
+        TelegramSession,
+        on_delete=models.CASCADE,
+        related_name='daily_rollups'
+    )
+    chat = models.ForeignKey(
+        TelegramChat,
+        on_delete=models.CASCADE,
+        related_name='daily_rollups'
+    )
+    day = models.DateField()
+    count = models.IntegerField(default=0)
+    outgoing = models.IntegerField(default=0)
+    incoming = models.IntegerField(default=0)
+    deleted = models.IntegerField(default=0)
+    media_count = models.IntegerField(default=0)
+    # Message counts for the day indexed by hour (0-23)
+    hour_counts = models.JSONField(default=list)
+
+    class Meta:
+        verbose_name = 'Message Daily Rollup'
+        verbose_name_plural = 'Message Daily Rollups'
+        unique_together = ['chat', 'day']
+        indexes = [
+            models.Index(fields=['session', 'day']),
+        ]
+
+    def __str__(self):
+        return f"{self.chat_id} {self.day}: {self.count}"
+
+    @classmethod
+    def refresh_for_chat(cls, chat, dates=None):
+        """
+        Rebuild the rollup rows of a chat from its stored messages.
+
+        ``dates`` are the datetimes of the messages that changed; when given,
+        only the days between the earliest and the latest of them are
+        re-aggregated, so a sync costs as much as its batch rather than the
+        chat's whole history.
+        """
+        messages = TelegramMessage.objects.filter(chat=chat)
+        rollups = cls.objects.filter(chat=chat)
+        if dates is not None:
+            days = [timezone.localdate(date) for date in dates if date]
+            if not days:
+                return
+            day_range = (min(days), max(days))
+            messages = messages.filter(date__date__range=day_range)
+            rollups = rollups.filter(day__range=day_range)
+
+        rows = messages.annotate(
+            day=TruncDate('date')
+        ).values('day').annotate(
+            count=Count('id'),
+            outgoing=Count('id', filter=Q(is_outgoing=True)),
+            incoming=Count('id', filter=Q(is_outgoing=False)),
+            deleted=Count('id', filter=Q(is_deleted=True)),
+            media_count=Count('id', filter=Q(has_media=True)),
+        ).order_by()
+
+        hourly = messages.annotate(
+            day=TruncDate('date'),
+            hour=ExtractHour('date'),
+        ).values_list('day', 'hour').annotate(count=Count('id')).order_by()
+
+        hour_counts = {}
+        for day, hour, count in hourly:
+            hour_counts.setdefault(day, [0] * 24)[hour] = count
+
+        with transaction.atomic():
+            rollups.delete()
+            cls.objects.bulk_create([
+                cls(session_id=chat.session_id, chat=chat, hour_counts=hour_counts[row['day']], **row)
+                for row in rows
+            ])
+            AnalyticsCache.invalidate(chat.session_id)
@@ -1,7 +1,13 @@
 import asyncio
+import atexit
+import contextlib
+import heapq
 import logging
-import os
 import mimetypes
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from operator import attrgetter, itemgetter
 from pathlib import Path
 from telethon import TelegramClient
 from telethon.sessions import StringSession
@@ -28,31 +34,220 @@ logger = logging.getLogger('telegram_functionality.services')
 sync_logger = logging.getLogger('telegram_functionality.sync')
 
 
+# Message attributes read when serializing, fetched in one C-level call
+_MSG_GET = attrgetter('id', 'text', 'date', 'out', 'media', 'forwards', 'views', 'reply_to')
+
+
+def _sender_fields(sender):
+    """Return ``(sender_id, sender_name)`` for a message sender (user, chat or channel)."""
+    if not sender:
+        return None, ''
+    title = getattr(sender, 'title', None)
+    if title is not None:
+        return sender.id, title
+    first_name = getattr(sender, 'first_name', None) or ''
+    last_name = getattr(sender, 'last_name', None)
+    return sender.id, f"{first_name} {last_name}" if last_name else first_name
+
+
+def get_chat_type(entity):
+    """Classify a Telethon chat entity as 'supergroup', 'channel', 'group' or 'user'."""
+    if getattr(entity, 'megagroup', False):
+        return 'supergroup'
+    if getattr(entity, 'broadcast', False):
+        return 'channel'
+    if getattr(entity, 'gigagroup', False):
+        return 'supergroup'
+    if hasattr(entity, 'participants_count'):
+        return 'group'
+    return 'user'
+
+
+class _ThreadedFileWriter:
+    """
+    Write-only file for Telethon downloads whose disk I/O runs on a worker thread.
+
+    All sessions share one event loop, so writing chunks on it would stall
+    every other session while a large file is saved. write() only queues
+    the chunk; aclose() waits until everything is on disk.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.size = 0
+        self._error = None
+        # A single worker keeps the chunks in order
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='media_writer')
+        self._file = self._executor.submit(open, path, 'wb')
+
+    def write(self, data):
+        self.size += len(data)
+        self._executor.submit(self._write, data)
+        return len(data)
+
+    def _write(self, data):
+        if self._error is None:
+            try:
+                self._file.result().write(data)
+            except Exception as e:
+                self._error = e
+
+    def _close(self, keep):
+        try:
+            self._file.result().close()
+        finally:
+            if not keep or self._error is not None:
+                Path(self.path).unlink(missing_ok=True)
+        if self._error is not None:
+            raise self._error
+
+    async def aclose(self, keep=True):
+        """Flush and close the file, deleting it unless ``keep``; raises the first write error."""
+        try:
+            await asyncio.wrap_future(self._executor.submit(self._close, keep))
+        finally:
+            self._executor.shutdown(wait=False)
+
+
 class TelegramClientManager:
     """Manager class for handling Telethon client operations."""
 
+    # Seconds an unused cached client stays connected
+    CLIENT_IDLE_TIMEOUT = 300
+    # Maximum concurrent per-chat requests in bulk fetches
+    FETCH_CONCURRENCY = 8
+    # Seconds a resolved chat entity is reused
+    ENTITY_CACHE_TTL = 300
+
     def __init__(self):
         self.api_id = settings.TELEGRAM_API_ID
         self.api_hash = settings.TELEGRAM_API_HASH
+        # Connected clients keyed by session string; only touched from self._loop
         self._clients = {}
+        self._client_locks = {}
+        self._client_users = {}
+        self._client_last_used = {}
+        # Chat entities keyed by (session string, chat id) -> (expires, entity, is full entity)
+        self._entity_cache = {}
+        self._loop = None
+        self._loop_lock = threading.Lock()
         logger.debug("TelegramClientManager initialized")
 
-    def _get_event_loop(self):
-        """Get or create event loop for current thread."""
+    def _run(self, coro):
+        """Run a coroutine on the manager's background event loop and wait for its result.
+
+        One long-lived loop serves every call, so there is no per-call loop
+        setup and cached clients stay bound to the loop they connected on.
+        """
+        if self._loop is None:
+            with self._loop_lock:
+                if self._loop is None:
+                    loop = asyncio.new_event_loop()
+                    threading.Thread(target=loop.run_forever, name='telegram_client_loop', daemon=True).start()
+                    self._loop = loop
+                    atexit.register(self.shutdown)
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+
+    async def _acquire_client(self, session_string):
+        """Return a connected client for the session, reusing a cached one when possible.
+
+        Every call must be paired with _release_client(), even if this raises.
+        """
+        self._client_users[session_string] = self._client_users.get(session_string, 0) + 1
+        await self._evict_idle_clients()
+
+        lock = self._client_locks.setdefault(session_string, asyncio.Lock())
+        async with lock:
+            client = self._clients.get(session_string)
+            if client is None:
+                client = self._clients[session_string] = self.get_client(session_string)
+            if not client.is_connected():
+                await client.connect()
+        return client
+
+    def _release_client(self, session_string):
+        self._client_users[session_string] -= 1
+        self._client_last_used[session_string] = time.monotonic()
+
+    @contextlib.asynccontextmanager
+    async def _session_client(self, session_string):
+        """Borrow the cached client of a session for the duration of the block."""
+        try:
+            yield await self._acquire_client(session_string)
+        finally:
+            self._release_client(session_string)
+
+    @contextlib.asynccontextmanager
+    async def _connected(self, client):
+        """Connect an uncached client for the duration of the block.
+
+        TelegramClient's own ``async with`` calls start(), which prompts for a
+        login, so it cannot be used for sessions that are not authorized yet.
+        """
         try:
-            # In Python 3.10+, get_event_loop() may fail in non-main threads
-            loop = asyncio.get_running_loop()
-        except RuntimeError:
-            # No running loop, try to get or create one
+            await client.connect()
+            yield client
+        finally:
+            await client.disconnect()
+
+    async def _drop_client(self, session_string):
+        """Disconnect and forget the cached client of a session."""
+        client = self._clients.pop(session_string, None)
+        self._client_locks.pop(session_string, None)
+        self._client_last_used.pop(session_string, None)
+        if not self._client_users.get(session_string):
+            self._client_users.pop(session_string, None)
+        if client is not None:
             try:
-                loop = asyncio.get_event_loop()
-                if loop.is_closed():
-                    raise RuntimeError("Loop is closed")
-            except RuntimeError:
-                # Create a new event loop for this thread
-                loop = asyncio.new_event_loop()
-                asyncio.set_event_loop(loop)
-        return loop
+                await client.disconnect()
+            except Exception as e:
+                logger.debug(f"Error disconnecting cached client: {e}")
+
+    async def _evict_idle_clients(self):
+        cutoff = time.monotonic() - self.CLIENT_IDLE_TIMEOUT
+        for session_string, last_used in list(self._client_last_used.items()):
+            if last_used < cutoff and not self._client_users.get(session_string):
+                await self._drop_client(session_string)
+
+    async def _get_entity(self, client, session_string, chat_id, full=True):
+        """
+        Return the entity of a chat, resolving it at most once per ENTITY_CACHE_TTL.
+
+        With ``full=False`` an input peer is enough, which is all a message
+        fetch needs; it is resolved from the session's own entity cache
+        instead of a GetChats/GetUsers request.
+        """
+        now = time.monotonic()
+        cached = self._entity_cache.get((session_string, chat_id))
+        if cached and cached[0] > now and (cached[2] or not full):
+            return cached[1]
+
+        if full:
+            entity = await client.get_entity(chat_id)
+        else:
+            entity = await client.get_input_entity(chat_id)
+        self._entity_cache = {key: value for key, value in self._entity_cache.items() if value[0] > now}
+        self._remember_entity(session_string, chat_id, entity, full)
+        return entity
+
+    def _remember_entity(self, session_string, chat_id, entity, full=True):
+        expires = time.monotonic() + self.ENTITY_CACHE_TTL
+        self._entity_cache[(session_string, chat_id)] = (expires, entity, full)
+
+    def shutdown(self):
+        """Disconnect all cached clients and stop the event loop; runs at interpreter exit."""
+        if self._loop is None:
+            return
+
+        async def _shutdown():
+            for session_string in list(self._clients):
+                await self._drop_client(session_string)
+
+        try:
+            asyncio.run_coroutine_threadsafe(_shutdown(), self._loop).result(timeout=10)
+        except Exception as e:
+            logger.debug(f"Error shutting down Telegram clients: {e}")
+        self._loop.call_soon_threadsafe(self._loop.stop)
 
     def get_client(self, session_string=None):
         """Create a new Telegram client."""
@@ -173,21 +368,27 @@ class TelegramClientManager:
         try:
             # Create directory structure: media/telegram_media/user_id/chat_id/message_id/
             media_dir = Path(save_dir) / 'telegram_media' / str(user_id) / str(chat_id) / str(message.id)
-            media_dir.mkdir(parents=True, exist_ok=True)
+            await asyncio.to_thread(media_dir.mkdir, parents=True, exist_ok=True)
 
             file_name = media_info['file_name'] or f'media_{message.id}'
             file_path = media_dir / file_name
 
-            # Download the media
-            downloaded_path = await client.download_media(message, file=str(file_path))
+            # Download the media; the chunks are written off the event loop
+            writer = _ThreadedFileWriter(file_path)
+            try:
+                downloaded = await client.download_media(message, file=writer)
+            except BaseException:
+                await writer.aclose(keep=False)
+                raise
+            await writer.aclose(keep=bool(downloaded))
 
-            if downloaded_path:
+            if downloaded:
                 # Get actual file size if not known
                 if not media_info['file_size']:
-                    media_info['file_size'] = os.path.getsize(downloaded_path)
+                    media_info['file_size'] = writer.size
 
                 # Return relative path from MEDIA_ROOT
-                rel_path = Path(downloaded_path).relative_to(save_dir)
+                rel_path = file_path.relative_to(save_dir)
                 return {
                     'file_path': str(rel_path),
                     'file_name': media_info['file_name'],
@@ -215,54 +416,50 @@ class TelegramClientManager:
         Returns:
             Dict with download result and media info
         """
-        loop = self._get_event_loop()
-        client = self.get_client(session_string)
 
         async def _download():
             try:
-                await client.connect()
+                async with self._session_client(session_string) as client:
 
-                # Get the message from Telegram
-                entity = await client.get_entity(chat_id)
-                messages = await client.get_messages(entity, ids=[message_id])
+                    # Get the message from Telegram
+                    entity = await self._get_entity(client, session_string, chat_id, full=False)
+                    messages = await client.get_messages(entity, ids=[message_id])
 
-                if not messages or not messages[0]:
-                    return {'success': False, 'error': 'Message not found on Telegram'}
+                    if not messages or not messages[0]:
+                        return {'success': False, 'error': 'Message not found on Telegram'}
 
-                message = messages[0]
+                    message = messages[0]
 
-                if not message.media:
-                    return {'success': False, 'error': 'Message has no media'}
+                    if not message.media:
+                        return {'success': False, 'error': 'Message has no media'}
 
-                # Get media info
-                media_info = self._get_media_info(message)
-                if not media_info:
-                    return {'success': False, 'error': 'Could not get media info'}
+                    # Get media info
+                    media_info = self._get_media_info(message)
+                    if not media_info:
+                        return {'success': False, 'error': 'Could not get media info'}
 
-                # Download without size limit (pass very large max_size)
-                result = await self._download_media_async(
-                    client, message, save_dir, user_id, chat_id,
-                    max_size=float('inf')  # No size limit for manual downloads
-                )
+                    # Download without size limit (pass very large max_size)
+                    result = await self._download_media_async(
+                        client, message, save_dir, user_id, chat_id,
+                        max_size=float('inf')  # No size limit for manual downloads
+                    )
 
-                if result and result.get('file_path'):
-                    return {
-                        'success': True,
-                        'file_path': result['file_path'],
-                        'file_name': result['file_name'],
-                        'file_size': result['file_size'],
-                        'mime_type': result['mime_type'],
-                    }
-                else:
-                    return {'success': False, 'error': 'Failed to download media'}
+                    if result and result.get('file_path'):
+                        return {
+                            'success': True,
+                            'file_path': result['file_path'],
+                            'file_name': result['file_name'],
+                            'file_size': result['file_size'],
+                            'mime_type': result['mime_type'],
+                        }
+                    else:
+                        return {'success': False, 'error': 'Failed to download media'}
 
             except Exception as e:
                 logger.error(f"Error downloading single media: {e}")
                 return {'success': False, 'error': str(e)}
-            finally:
-                await client.disconnect()
 
-        return loop.run_until_complete(_download())
+        return self._run(_download())
 
     async def _send_code_async(self, client, phone_number):
         """Send verification code to phone number."""
@@ -273,22 +470,21 @@ class TelegramClientManager:
     def send_code(self, phone_number):
         """Synchronous wrapper to send verification code."""
         logger.info(f"API CALL: send_code - phone: {phone_number[:4]}****")
-        loop = self._get_event_loop()
         client = self.get_client()
 
         async def _send():
             try:
                 logger.debug("Connecting to Telegram...")
-                await client.connect()
-                logger.debug("Sending code request...")
-                result = await client.send_code_request(phone_number)
-                session_string = client.session.save()
-                logger.info(f"Code sent successfully to {phone_number[:4]}****")
-                return {
-                    'success': True,
-                    'phone_code_hash': result.phone_code_hash,
-                    'session_string': session_string,
-                }
+                async with self._connected(client):
+                    logger.debug("Sending code request...")
+                    result = await client.send_code_request(phone_number)
+                    session_string = client.session.save()
+                    logger.info(f"Code sent successfully to {phone_number[:4]}****")
+                    return {
+                        'success': True,
+                        'phone_code_hash': result.phone_code_hash,
+                        'session_string': session_string,
+                    }
             except FloodWaitError as e:
                 logger.warning(f"FloodWaitError: Need to wait {e.seconds} seconds")
                 return {
@@ -303,35 +499,33 @@ class TelegramClientManager:
                     'error': str(e),
                 }
             finally:
-                await client.disconnect()
                 logger.debug("Disconnected from Telegram")
 
-        return loop.run_until_complete(_send())
+        return self._run(_send())
 
     def verify_code(self, session_string, phone_number, phone_code_hash, code):
         """Verify the code sent to phone."""
-        loop = self._get_event_loop()
         client = self.get_client(session_string)
 
         async def _verify():
             try:
-                await client.connect()
-                await client.sign_in(
-                    phone=phone_number,
-                    code=code,
-                    phone_code_hash=phone_code_hash
-                )
-                me = await client.get_me()
-                new_session_string = client.session.save()
-                return {
-                    'success': True,
-                    'session_string': new_session_string,
-                    'user_id': me.id,
-                    'username': me.username,
-                    'first_name': me.first_name,
-                    'last_name': me.last_name,
-                    'requires_2fa': False,
-                }
+                async with self._connected(client):
+                    await client.sign_in(
+                        phone=phone_number,
+                        code=code,
+                        phone_code_hash=phone_code_hash
+                    )
+                    me = await client.get_me()
+                    new_session_string = client.session.save()
+                    return {
+                        'success': True,
+                        'session_string': new_session_string,
+                        'user_id': me.id,
+                        'username': me.username,
+                        'first_name': me.first_name,
+                        'last_name': me.last_name,
+                        'requires_2fa': False,
+                    }
             except SessionPasswordNeededError:
                 new_session_string = client.session.save()
                 return {
@@ -354,30 +548,27 @@ class TelegramClientManager:
                     'success': False,
                     'error': str(e),
                 }
-            finally:
-                await client.disconnect()
 
-        return loop.run_until_complete(_verify())
+        return self._run(_verify())
 
     def verify_2fa(self, session_string, password):
         """Verify 2FA password."""
-        loop = self._get_event_loop()
         client = self.get_client(session_string)
 
         async def _verify_2fa():
             try:
-                await client.connect()
-                await client.sign_in(password=password)
-                me = await client.get_me()
-                new_session_string = client.session.save()
-                return {
-                    'success': True,
-                    'session_string': new_session_string,
-                    'user_id': me.id,
-                    'username': me.username,
-                    'first_name': me.first_name,
-                    'last_name': me.last_name,
-                }
+                async with self._connected(client):
+                    await client.sign_in(password=password)
+                    me = await client.get_me()
+                    new_session_string = client.session.save()
+                    return {
+                        'success': True,
+                        'session_string': new_session_string,
+                        'user_id': me.id,
+                        'username': me.username,
+                        'first_name': me.first_name,
+                        'last_name': me.last_name,
+                    }
             except PasswordHashInvalidError:
                 return {
                     'success': False,
@@ -388,308 +579,256 @@ class TelegramClientManager:
                     'success': False,
                     'error': str(e),
                 }
-            finally:
-                await client.disconnect()
 
-        return loop.run_until_complete(_verify_2fa())
+        return self._run(_verify_2fa())
 
     def disconnect_session(self, session_string):
         """Disconnect and logout from Telegram."""
-        loop = self._get_event_loop()
         client = self.get_client(session_string)
 
         async def _disconnect():
             try:
-                await client.connect()
-                await client.log_out()
-                return {'success': True}
+                await self._drop_client(session_string)
+                async with self._connected(client):
+                    await client.log_out()
+                    return {'success': True}
             except Exception as e:
                 return {'success': False, 'error': str(e)}
-            finally:
-                await client.disconnect()
 
-        return loop.run_until_complete(_disconnect())
+        return self._run(_disconnect())
 
     def get_dialogs(self, session_string, limit=100):
         """Get user's dialogs/chats."""
-        loop = self._get_event_loop()
-        client = self.get_client(session_string)
 
         async def _get_dialogs():
             try:
-                await client.connect()
-                dialogs = await client.get_dialogs(limit=limit)
-                result = []
-                for dialog in dialogs:
-                    entity = dialog.entity
-                    chat_type = 'user'
-                    if hasattr(entity, 'megagroup') and entity.megagroup:
-                        chat_type = 'supergroup'
-                    elif hasattr(entity, 'broadcast') and entity.broadcast:
-                        chat_type = 'channel'
-                    elif hasattr(entity, 'gigagroup') and entity.gigagroup:
-                        chat_type = 'supergroup'
-                    elif hasattr(entity, 'participants_count'):
-                        chat_type = 'group'
-
-                    result.append({
-                        'id': dialog.id,
-                        'title': dialog.title or dialog.name,
-                        'type': chat_type,
-                        'username': getattr(entity, 'username', None),
-                        'unread_count': dialog.unread_count,
-                        'is_archived': dialog.archived,
-                    })
-                return {'success': True, 'dialogs': result}
+                async with self._session_client(session_string) as client:
+                    dialogs = await client.get_dialogs(limit=limit)
+                    result = []
+                    for dialog in dialogs:
+                        entity = dialog.entity
+                        chat_type = get_chat_type(entity)
+
+                        result.append({
+                            'id': dialog.id,
+                            'title': dialog.title or dialog.name,
+                            'type': chat_type,
+                            'username': getattr(entity, 'username', None),
+                            'unread_count': dialog.unread_count,
+                            'is_archived': dialog.archived,
+                        })
+                    return {'success': True, 'dialogs': result}
             except Exception as e:
                 return {'success': False, 'error': str(e)}
-            finally:
-                await client.disconnect()
 
-        return loop.run_until_complete(_get_dialogs())
+        return self._run(_get_dialogs())
 
     def check_session(self, session_string):
         """Check if session is still valid."""
-        loop = self._get_event_loop()
-        client = self.get_client(session_string)
 
         async def _check():
             try:
-                await client.connect()
-                if await client.is_user_authorized():
-                    me = await client.get_me()
-                    return {
-                        'success': True,
-                        'is_valid': True,
-                        'user_id': me.id,
-                        'username': me.username,
-                        'first_name': me.first_name,
-                        'last_name': me.last_name,
-                    }
-                return {'success': True, 'is_valid': False}
+                async with self._session_client(session_string) as client:
+                    if await client.is_user_authorized():
+                        me = await client.get_me()
+                        return {
+                            'success': True,
+                            'is_valid': True,
+                            'user_id': me.id,
+                            'username': me.username,
+                            'first_name': me.first_name,
+                            'last_name': me.last_name,
+                        }
+                    return {'success': True, 'is_valid': False}
             except Exception as e:
                 return {'success': False, 'error': str(e), 'is_valid': False}
-            finally:
-                await client.disconnect()
 
-        return loop.run_until_complete(_check())
+        return self._run(_check())
 
     def get_messages(self, session_string, chat_id, limit=50, offset_id=0):
         """Get messages from a specific chat."""
-        loop = self._get_event_loop()
-        client = self.get_client(session_string)
 
         async def _get_messages():
             try:
-                await client.connect()
-                entity = await client.get_entity(chat_id)
-                messages = await client.get_messages(entity, limit=limit, offset_id=offset_id)
-
-                result = []
-                for msg in messages:
-                    sender_name = ''
-                    sender_id = None
-                    if msg.sender:
-                        sender_id = msg.sender.id
-                        if hasattr(msg.sender, 'first_name'):
-                            sender_name = msg.sender.first_name or ''
-                            if hasattr(msg.sender, 'last_name') and msg.sender.last_name:
-                                sender_name += ' ' + msg.sender.last_name
-                        elif hasattr(msg.sender, 'title'):
-                            sender_name = msg.sender.title
-
-                    result.append({
-                        'id': msg.id,
-                        'text': msg.text or '',
-                        'date': msg.date.isoformat() if msg.date else None,
-                        'sender_id': sender_id,
-                        'sender_name': sender_name,
-                        'is_outgoing': msg.out,
-                        'has_media': msg.media is not None,
-                        'media_type': type(msg.media).__name__ if msg.media else None,
-                        'reply_to_msg_id': msg.reply_to.reply_to_msg_id if msg.reply_to else None,
-                        'forwards': msg.forwards,
-                        'views': msg.views,
-                    })
-
-                return {'success': True, 'messages': result}
+                async with self._session_client(session_string) as client:
+                    entity = await self._get_entity(client, session_string, chat_id, full=False)
+                    messages = await client.get_messages(entity, limit=limit, offset_id=offset_id)
+
+                    result = []
+                    for msg in messages:
+                        msg_id, text, date, out, media, forwards, views, reply_to = _MSG_GET(msg)
+                        sender_id, sender_name = _sender_fields(msg.sender)
+
+                        result.append({
+                            'id': msg_id,
+                            'text': text or '',
+                            'date': date.isoformat() if date else None,
+                            'sender_id': sender_id,
+                            'sender_name': sender_name,
+                            'is_outgoing': out,
+                            'has_media': media is not None,
+                            'media_type': type(media).__name__ if media else None,
+                            'reply_to_msg_id': reply_to.reply_to_msg_id if reply_to else None,
+                            'forwards': forwards,
+                            'views': views,
+                        })
+
+                    return {'success': True, 'messages': result}
             except Exception as e:
                 return {'success': False, 'error': str(e)}
-            finally:
-                await client.disconnect()
 
-        return loop.run_until_complete(_get_messages())
+        return self._run(_get_messages())
 
     def get_chat_info(self, session_string, chat_id):
         """Get detailed information about a chat."""
-        loop = self._get_event_loop()
-        client = self.get_client(session_string)
 
         async def _get_chat_info():
             try:
-                await client.connect()
-                entity = await client.get_entity(chat_id)
+                async with self._session_client(session_string) as client:
+                    entity = await self._get_entity(client, session_string, chat_id)
 
-                chat_type = 'user'
-                members_count = None
-                photo = None
+                    chat_type = get_chat_type(entity)
+                    members_count = None
+                    photo = None
 
-                if hasattr(entity, 'megagroup') and entity.megagroup:
-                    chat_type = 'supergroup'
-                elif hasattr(entity, 'broadcast') and entity.broadcast:
-                    chat_type = 'channel'
-                elif hasattr(entity, 'participants_count'):
-                    chat_type = 'group'
+                    if hasattr(entity, 'participants_count'):
+                        members_count = entity.participants_count
 
-                if hasattr(entity, 'participants_count'):
-                    members_count = entity.participants_count
+                    title = getattr(entity, 'title', None)
+                    if not title:
+                        first_name = getattr(entity, 'first_name', '') or ''
+                        last_name = getattr(entity, 'last_name', '') or ''
+                        title = f"{first_name} {last_name}".strip()
 
-                title = getattr(entity, 'title', None)
-                if not title:
-                    first_name = getattr(entity, 'first_name', '') or ''
-                    last_name = getattr(entity, 'last_name', '') or ''
-                    title = f"{first_name} {last_name}".strip()
-
-                return {
-                    'success': True,
-                    'chat': {
-                        'id': entity.id,
-                        'title': title,
-                        'type': chat_type,
-                        'username': getattr(entity, 'username', None),
-                        'members_count': members_count,
-                        'about': getattr(entity, 'about', None),
+                    return {
+                        'success': True,
+                        'chat': {
+                            'id': entity.id,
+                            'title': title,
+                            'type': chat_type,
+                            'username': getattr(entity, 'username', None),
+                            'members_count': members_count,
+                            'about': getattr(entity, 'about', None),
+                        }
                     }
-                }
             except Exception as e:
                 return {'success': False, 'error': str(e)}
-            finally:
-                await client.disconnect()
 
-        return loop.run_until_complete(_get_chat_info())
+        return self._run(_get_chat_info())
 
-    def get_all_chats(self, session_string, limit=None):
-        """Get all user's chats with full details."""
-        loop = self._get_event_loop()
-        client = self.get_client(session_string)
+    @staticmethod
+    def _chat_summary(dialog):
+        """Build the get_all_chats entry for a dialog."""
+        entity = dialog.entity
 
-        async def _get_all_chats():
-            try:
-                await client.connect()
-                dialogs = await client.get_dialogs(limit=limit)
-                result = []
-
-                for dialog in dialogs:
-                    entity = dialog.entity
-                    chat_type = 'user'
-
-                    if hasattr(entity, 'megagroup') and entity.megagroup:
-                        chat_type = 'supergroup'
-                    elif hasattr(entity, 'broadcast') and entity.broadcast:
-                        chat_type = 'channel'
-                    elif hasattr(entity, 'gigagroup') and entity.gigagroup:
-                        chat_type = 'supergroup'
-                    elif hasattr(entity, 'participants_count'):
-                        chat_type = 'group'
-
-                    last_message = None
-                    if dialog.message:
-                        last_message = {
-                            'id': dialog.message.id,
-                            'text': dialog.message.text[:100] if dialog.message.text else '',
-                            'date': dialog.message.date.isoformat() if dialog.message.date else None,
-                        }
+        last_message = None
+        if dialog.message:
+            last_message = {
+                'id': dialog.message.id,
+                'text': dialog.message.text[:100] if dialog.message.text else '',
+                'date': dialog.message.date.isoformat() if dialog.message.date else None,
+            }
 
-                    result.append({
-                        'id': dialog.id,
-                        'title': dialog.title or dialog.name,
-                        'type': chat_type,
-                        'username': getattr(entity, 'username', None),
-                        'unread_count': dialog.unread_count,
-                        'is_archived': dialog.archived,
-                        'is_pinned': dialog.pinned,
-                        'last_message': last_message,
-                        'members_count': getattr(entity, 'participants_count', None),
-                    })
-
-                return {'success': True, 'chats': result, 'total': len(result)}
-            except Exception as e:
-                return {'success': False, 'error': str(e)}
-            finally:
-                await client.disconnect()
+        return {
+            'id': dialog.id,
+            'title': dialog.title or dialog.name,
+            'type': get_chat_type(entity),
+            'username': getattr(entity, 'username', None),
+            'unread_count': dialog.unread_count,
+            'is_archived': dialog.archived,
+            'is_pinned': dialog.pinned,
+            'last_message': last_message,
+            'members_count': getattr(entity, 'participants_count', None),
+        }
 
-        return loop.run_until_complete(_get_all_chats())
+    async def _recent_messages(self, client, dialogs, chats, limit_per_chat):
+        """Fetch the newest messages of each dialog and merge them newest first."""
+        # Fetch the chats concurrently, a few at a time to stay clear of flood limits
+        semaphore = asyncio.Semaphore(self.FETCH_CONCURRENCY)
+
+        async def _fetch(entity):
+            async with semaphore:
+                return await client.get_messages(entity, limit=limit_per_chat)
+
+        results = await asyncio.gather(
+            *(_fetch(dialog.entity) for dialog in dialogs), return_exceptions=True
+        )
+
+        # One newest-first list of (timestamp, message) per chat
+        per_chat = []
+        for chat, messages in zip(chats, results):
+            if isinstance(messages, Exception):
+                logger.warning(f"Could not fetch recent messages of chat {chat['id']}: {messages}")
+                continue
+
+            chat_id = chat['id']
+            chat_title = chat['title']
+            chat_type = chat['type']
+
+            chat_messages = []
+            for msg in messages:
+                msg_id, text, date, out, media, forwards, views, reply_to = _MSG_GET(msg)
+                sender_id, sender_name = _sender_fields(msg.sender)
+
+                chat_messages.append((date.timestamp() if date else 0.0, {
+                    'id': msg_id,
+                    'chat_id': chat_id,
+                    'chat_title': chat_title,
+                    'chat_type': chat_type,
+                    'text': text or '',
+                    'date': date.isoformat() if date else None,
+                    'sender_id': sender_id,
+                    'sender_name': sender_name,
+                    'is_outgoing': out,
+                    'has_media': media is not None,
+                    'media_type': type(media).__name__ if media else None,
+                }))
+            per_chat.append(chat_messages)
+
+        # Telegram returns each chat newest first, so a k-way merge
+        # yields all messages by date (newest first)
+        return [msg for _, msg in heapq.merge(*per_chat, key=itemgetter(0), reverse=True)]
+
+    def get_chats_with_messages(self, session_string, limit_per_chat=10, max_chats=50):
+        """
+        Get the user's chats and their recent messages from a single dialog scan.
 
-    def get_all_messages(self, session_string, limit_per_chat=10, max_chats=50):
-        """Get recent messages from all chats combined."""
-        loop = self._get_event_loop()
-        client = self.get_client(session_string)
+        Returns the ``chats`` of get_all_chats and the ``messages`` of
+        get_all_messages; pass ``limit_per_chat=0`` to skip the message fetch.
+        """
 
-        async def _get_all_messages():
+        async def _get_chats_with_messages():
             try:
-                await client.connect()
-                dialogs = await client.get_dialogs(limit=max_chats)
-                all_messages = []
-
-                for dialog in dialogs:
-                    entity = dialog.entity
-                    chat_type = 'user'
-
-                    if hasattr(entity, 'megagroup') and entity.megagroup:
-                        chat_type = 'supergroup'
-                    elif hasattr(entity, 'broadcast') and entity.broadcast:
-                        chat_type = 'channel'
-                    elif hasattr(entity, 'gigagroup') and entity.gigagroup:
-                        chat_type = 'supergroup'
-                    elif hasattr(entity, 'participants_count'):
-                        chat_type = 'group'
-
-                    chat_title = dialog.title or dialog.name
-
-                    # Get recent messages from this chat
-                    messages = await client.get_messages(entity, limit=limit_per_chat)
-
-                    for msg in messages:
-                        sender_name = ''
-                        sender_id = None
-                        if msg.sender:
-                            sender_id = msg.sender.id
-                            if hasattr(msg.sender, 'first_name'):
-                                sender_name = msg.sender.first_name or ''
-                                if hasattr(msg.sender, 'last_name') and msg.sender.last_name:
-                                    sender_name += ' ' + msg.sender.last_name
-                            elif hasattr(msg.sender, 'title'):
-                                sender_name = msg.sender.title
-
-                        all_messages.append({
-                            'id': msg.id,
-                            'chat_id': dialog.id,
-                            'chat_title': chat_title,
-                            'chat_type': chat_type,
-                            'text': msg.text or '',
-                            'date': msg.date.isoformat() if msg.date else None,
-                            'date_obj': msg.date,
-                            'sender_id': sender_id,
-                            'sender_name': sender_name,
-                            'is_outgoing': msg.out,
-                            'has_media': msg.media is not None,
-                            'media_type': type(msg.media).__name__ if msg.media else None,
-                        })
-
-                # Sort all messages by date (newest first)
-                all_messages.sort(key=lambda x: x['date_obj'] or '', reverse=True)
-
-                # Remove date_obj (not JSON serializable)
-                for msg in all_messages:
-                    del msg['date_obj']
-
-                return {'success': True, 'messages': all_messages, 'total': len(all_messages)}
+                async with self._session_client(session_string) as client:
+                    dialogs = await client.get_dialogs(limit=max_chats)
+                    chats = [self._chat_summary(dialog) for dialog in dialogs]
+                    # The dialogs carry full entities; later per-chat calls reuse them
+                    for dialog in dialogs:
+                        self._remember_entity(session_string, dialog.id, dialog.entity)
+
+                    messages = []
+                    if limit_per_chat:
+                        messages = await self._recent_messages(client, dialogs, chats, limit_per_chat)
+
+                    return {'success': True, 'chats': chats, 'messages': messages}
             except Exception as e:
                 return {'success': False, 'error': str(e)}
-            finally:
-                await client.disconnect()
 
-        return loop.run_until_complete(_get_all_messages())
+        return self._run(_get_chats_with_messages())
+
+    def get_all_chats(self, session_string, limit=None):
+        """Get all user's chats with full details."""
+        result = self.get_chats_with_messages(session_string, limit_per_chat=0, max_chats=limit)
+        if not result['success']:
+            return result
+        return {'success': True, 'chats': result['chats'], 'total': len(result['chats'])}
+
+    def get_all_messages(self, session_string, limit_per_chat=10, max_chats=50):
+        """Get recent messages from all chats combined."""
+        result = self.get_chats_with_messages(session_string, limit_per_chat=limit_per_chat, max_chats=max_chats)
+        if not result['success']:
+            return result
+        return {'success': True, 'messages': result['messages'], 'total': len(result['messages'])}
 
     def fetch_all_messages_from_chat(self, session_string, chat_id, min_id=0,
                                        download_media=False, user_id=None, media_dir=None):
@@ -706,147 +845,131 @@ class TelegramClientManager:
         Returns:
             Dict with success, messages list, and total count
         """
-        loop = self._get_event_loop()
-        client = self.get_client(session_string)
 
         async def _fetch_all():
             try:
-                await client.connect()
-                entity = await client.get_entity(chat_id)
-                all_messages = []
-                offset_id = 0
-                batch_size = 100
-
-                while True:
-                    messages = await client.get_messages(
-                        entity,
-                        limit=batch_size,
-                        offset_id=offset_id,
-                        min_id=min_id
-                    )
-
-                    if not messages:
-                        break
-
-                    for msg in messages:
-                        sender_name = ''
-                        sender_id = None
-                        if msg.sender:
-                            sender_id = msg.sender.id
-                            if hasattr(msg.sender, 'first_name'):
-                                sender_name = msg.sender.first_name or ''
-                                if hasattr(msg.sender, 'last_name') and msg.sender.last_name:
-                                    sender_name += ' ' + msg.sender.last_name
-                            elif hasattr(msg.sender, 'title'):
-                                sender_name = msg.sender.title
-
-                        msg_data = {
-                            'id': msg.id,
-                            'text': msg.text or '',
-                            'date': msg.date,
-                            'sender_id': sender_id,
-                            'sender_name': sender_name,
-                            'is_outgoing': msg.out,
-                            'has_media': msg.media is not None,
-                            'media_type': type(msg.media).__name__ if msg.media else None,
-                            'reply_to_msg_id': msg.reply_to.reply_to_msg_id if msg.reply_to else None,
-                            'forwards': msg.forwards,
-                            'views': msg.views,
-                            # Media fields (will be populated if download_media=True)
-                            'media_file_path': None,
-                            'media_file_name': None,
-                            'media_file_size': None,
-                            'media_mime_type': None,
-                            'media_width': None,
-                            'media_height': None,
-                            'media_duration': None,
-                        }
-
-                        # Download media if requested
-                        if download_media and msg.media and user_id and media_dir:
-                            media_result = await self._download_media_async(
-                                client, msg, media_dir, user_id, chat_id
-                            )
-                            if media_result:
-                                msg_data['media_file_path'] = media_result['file_path']
-                                msg_data['media_file_name'] = media_result['file_name']
-                                msg_data['media_file_size'] = media_result['file_size']
-                                msg_data['media_mime_type'] = media_result['mime_type']
-                                msg_data['media_width'] = media_result['width']
-                                msg_data['media_height'] = media_result['height']
-                                msg_data['media_duration'] = media_result['duration']
-                                msg_data['media_skipped'] = media_result.get('skipped', False)
+                async with self._session_client(session_string) as client:
+                    entity = await self._get_entity(client, session_string, chat_id, full=False)
+                    all_messages = []
+                    offset_id = 0
+                    batch_size = 100
+
+                    while True:
+                        messages = await client.get_messages(
+                            entity,
+                            limit=batch_size,
+                            offset_id=offset_id,
+                            min_id=min_id
+                        )
+
+                        if not messages:
+                            break
+
+                        for msg in messages:
+                            msg_id, text, date, out, media, forwards, views, reply_to = _MSG_GET(msg)
+                            sender_id, sender_name = _sender_fields(msg.sender)
+
+                            msg_data = {
+                                'id': msg_id,
+                                'text': text or '',
+                                'date': date,
+                                'sender_id': sender_id,
+                                'sender_name': sender_name,
+                                'is_outgoing': out,
+                                'has_media': media is not None,
+                                'media_type': type(media).__name__ if media else None,
+                                'reply_to_msg_id': reply_to.reply_to_msg_id if reply_to else None,
+                                'forwards': forwards,
+                                'views': views,
+                                # Media fields (will be populated if download_media=True)
+                                'media_file_path': None,
+                                'media_file_name': None,
+                                'media_file_size': None,
+                                'media_mime_type': None,
+                                'media_width': None,
+                                'media_height': None,
+                                'media_duration': None,
+                            }
+
+                            # Download media if requested
+                            if download_media and media and user_id and media_dir:
+                                media_result = await self._download_media_async(
+                                    client, msg, media_dir, user_id, chat_id
+                                )
+                                if media_result:
+                                    msg_data['media_file_path'] = media_result['file_path']
+                                    msg_data['media_file_name'] = media_result['file_name']
+                                    msg_data['media_file_size'] = media_result['file_size']
+                                    msg_data['media_mime_type'] = media_result['mime_type']
+                                    msg_data['media_width'] = media_result['width']
+                                    msg_data['media_height'] = media_result['height']
+                                    msg_data['media_duration'] = media_result['duration']
+                                    msg_data['media_skipped'] = media_result.get('skipped', False)
 
-                        all_messages.append(msg_data)
+                            all_messages.append(msg_data)
 
-                    offset_id = messages[-1].id
+                        offset_id = messages[-1].id
 
-                    # Safety check to prevent infinite loops
-                    if len(messages) < batch_size:
-                        break
+                        # Safety check to prevent infinite loops
+                        if len(messages) < batch_size:
+                            break
 
-                return {
-                    'success': True,
-                    'messages': all_messages,
-                    'total': len(all_messages)
-                }
+                    return {
+                        'success': True,
+                        'messages': all_messages,
+                        'total': len(all_messages)
+                    }
             except Exception as e:
                 return {'success': False, 'error': str(e)}
-            finally:
-                await client.disconnect()
 
-        return loop.run_until_complete(_fetch_all())
+        return self._run(_fetch_all())
 
     def get_message_ids_from_chat(self, session_string, chat_id, limit=None):
         """Get all message IDs from a chat (for deletion checking).
 
         Returns only message IDs to compare against database.
         """
-        loop = self._get_event_loop()
-        client = self.get_client(session_string)
 
         async def _get_ids():
             try:
-                await client.connect()
-                entity = await client.get_entity(chat_id)
-                message_ids = set()
-                offset_id = 0
-                batch_size = 100
-                fetched = 0
-
-                while True:
-                    messages = await client.get_messages(
-                        entity,
-                        limit=batch_size,
-                        offset_id=offset_id
-                    )
+                async with self._session_client(session_string) as client:
+                    entity = await self._get_entity(client, session_string, chat_id, full=False)
+                    message_ids = set()
+                    offset_id = 0
+                    batch_size = 100
+                    fetched = 0
 
-                    if not messages:
-                        break
+                    while True:
+                        messages = await client.get_messages(
+                            entity,
+                            limit=batch_size,
+                            offset_id=offset_id
+                        )
 
-                    for msg in messages:
-                        message_ids.add(msg.id)
+                        if not messages:
+                            break
 
-                    offset_id = messages[-1].id
-                    fetched += len(messages)
+                        for msg in messages:
+                            message_ids.add(msg.id)
 
-                    if limit and fetched >= limit:
-                        break
+                        offset_id = messages[-1].id
+                        fetched += len(messages)
 
-                    if len(messages) < batch_size:
-                        break
+                        if limit and fetched >= limit:
+                            break
 
-                return {
-                    'success': True,
-                    'message_ids': message_ids,
-                    'total': len(message_ids)
-                }
+                        if len(messages) < batch_size:
+                            break
+
+                    return {
+                        'success': True,
+                        'message_ids': message_ids,
+                        'total': len(message_ids)
+                    }
             except Exception as e:
                 return {'success': False, 'error': str(e)}
-            finally:
-                await client.disconnect()
 
-        return loop.run_until_complete(_get_ids())
+        return self._run(_get_ids())
 
     def get_chat_participants(self, session_string, chat_id, limit=None):
         """Get all participants/members from a chat/group/channel.
@@ -859,8 +982,6 @@ class TelegramClientManager:
         Returns:
             Dict with success, participants list, and total count
         """
-        loop = self._get_event_loop()
-        client = self.get_client(session_string)
 
         async def _get_participants():
             try:
@@ -880,98 +1001,96 @@ class TelegramClientManager:
                 from telethon.tl.functions.channels import GetParticipantsRequest
                 from telethon.tl.types import ChannelParticipantsSearch
 
-                await client.connect()
-                entity = await client.get_entity(chat_id)
-
-                participants = []
-                offset = 0
-                batch_size = 100
-
-                # Get participants using iter_participants for better compatibility
-                async for user in client.iter_participants(entity, limit=limit):
-                    # Determine user status
-                    status = 'unknown'
-                    last_online = None
-
-                    if hasattr(user, 'status') and user.status:
-                        if isinstance(user.status, UserStatusOnline):
-                            status = 'online'
-                        elif isinstance(user.status, UserStatusOffline):
-                            status = 'offline'
-                            last_online = user.status.was_online
-                        elif isinstance(user.status, UserStatusRecently):
-                            status = 'recently'
-                        elif isinstance(user.status, UserStatusLastWeek):
-                            status = 'last_week'
-                        elif isinstance(user.status, UserStatusLastMonth):
-                            status = 'last_month'
-
-                    # Determine role
-                    role = 'member'
-                    admin_title = None
-                    admin_rights = {}
-
-                    if hasattr(user, 'participant'):
-                        p = user.participant
-                        if isinstance(p, (ChannelParticipantCreator, ChatParticipantCreator)):
-                            role = 'creator'
-                            if hasattr(p, 'rank'):
-                                admin_title = p.rank
-                        elif isinstance(p, (ChannelParticipantAdmin, ChatParticipantAdmin)):
-                            role = 'admin'
-                            if hasattr(p, 'rank'):
-                                admin_title = p.rank
-                            if hasattr(p, 'admin_rights'):
-                                rights = p.admin_rights
-                                admin_rights = {
-                                    'change_info': getattr(rights, 'change_info', False),
-                                    'post_messages': getattr(rights, 'post_messages', False),
-                                    'edit_messages': getattr(rights, 'edit_messages', False),
-                                    'delete_messages': getattr(rights, 'delete_messages', False),
-                                    'ban_users': getattr(rights, 'ban_users', False),
-                                    'invite_users': getattr(rights, 'invite_users', False),
-                                    'pin_messages': getattr(rights, 'pin_messages', False),
-                                    'add_admins': getattr(rights, 'add_admins', False),
-                                    'manage_call': getattr(rights, 'manage_call', False),
-                                }
-                        elif isinstance(p, ChannelParticipantBanned):
-                            role = 'banned'
-
-                    participant_data = {
-                        'user_id': user.id,
-                        'username': user.username,
-                        'first_name': user.first_name,
-                        'last_name': user.last_name,
-                        'phone': user.phone if hasattr(user, 'phone') else None,
-                        'is_bot': user.bot if hasattr(user, 'bot') else False,
-                        'is_verified': user.verified if hasattr(user, 'verified') else False,
-                        'is_premium': user.premium if hasattr(user, 'premium') else False,
-                        'is_scam': user.scam if hasattr(user, 'scam') else False,
-                        'is_fake': user.fake if hasattr(user, 'fake') else False,
-                        'is_deleted': user.deleted if hasattr(user, 'deleted') else False,
-                        'status': status,
-                        'last_online': last_online,
-                        'role': role,
-                        'admin_title': admin_title,
-                        'admin_rights': admin_rights,
-                        'photo_id': user.photo.photo_id if hasattr(user, 'photo') and user.photo else None,
-                    }
+                async with self._session_client(session_string) as client:
+                    entity = await self._get_entity(client, session_string, chat_id, full=False)
+
+                    participants = []
+                    offset = 0
+                    batch_size = 100
+
+                    # Get participants using iter_participants for better compatibility
+                    async for user in client.iter_participants(entity, limit=limit):
+                        # Determine user status
+                        status = 'unknown'
+                        last_online = None
+
+                        if hasattr(user, 'status') and user.status:
+                            if isinstance(user.status, UserStatusOnline):
+                                status = 'online'
+                            elif isinstance(user.status, UserStatusOffline):
+                                status = 'offline'
+                                last_online = user.status.was_online
+                            elif isinstance(user.status, UserStatusRecently):
+                                status = 'recently'
+                            elif isinstance(user.status, UserStatusLastWeek):
+                                status = 'last_week'
+                            elif isinstance(user.status, UserStatusLastMonth):
+                                status = 'last_month'
+
+                        # Determine role
+                        role = 'member'
+                        admin_title = None
+                        admin_rights = {}
+
+                        if hasattr(user, 'participant'):
+                            p = user.participant
+                            if isinstance(p, (ChannelParticipantCreator, ChatParticipantCreator)):
+                                role = 'creator'
+                                if hasattr(p, 'rank'):
+                                    admin_title = p.rank
+                            elif isinstance(p, (ChannelParticipantAdmin, ChatParticipantAdmin)):
+                                role = 'admin'
+                                if hasattr(p, 'rank'):
+                                    admin_title = p.rank
+                                if hasattr(p, 'admin_rights'):
+                                    rights = p.admin_rights
+                                    admin_rights = {
+                                        'change_info': getattr(rights, 'change_info', False),
+                                        'post_messages': getattr(rights, 'post_messages', False),
+                                        'edit_messages': getattr(rights, 'edit_messages', False),
+                                        'delete_messages': getattr(rights, 'delete_messages', False),
+                                        'ban_users': getattr(rights, 'ban_users', False),
+                                        'invite_users': getattr(rights, 'invite_users', False),
+                                        'pin_messages': getattr(rights, 'pin_messages', False),
+                                        'add_admins': getattr(rights, 'add_admins', False),
+                                        'manage_call': getattr(rights, 'manage_call', False),
+                                    }
+                            elif isinstance(p, ChannelParticipantBanned):
+                                role = 'banned'
+
+                        participant_data = {
+                            'user_id': user.id,
+                            'username': user.username,
+                            'first_name': user.first_name,
+                            'last_name': user.last_name,
+                            'phone': user.phone if hasattr(user, 'phone') else None,
+                            'is_bot': user.bot if hasattr(user, 'bot') else False,
+                            'is_verified': user.verified if hasattr(user, 'verified') else False,
+                            'is_premium': user.premium if hasattr(user, 'premium') else False,
+                            'is_scam': user.scam if hasattr(user, 'scam') else False,
+                            'is_fake': user.fake if hasattr(user, 'fake') else False,
+                            'is_deleted': user.deleted if hasattr(user, 'deleted') else False,
+                            'status': status,
+                            'last_online': last_online,
+                            'role': role,
+                            'admin_title': admin_title,
+                            'admin_rights': admin_rights,
+                            'photo_id': user.photo.photo_id if hasattr(user, 'photo') and user.photo else None,
+                        }
 
-                    participants.append(participant_data)
+                        participants.append(participant_data)
 
-                return {
-                    'success': True,
-                    'participants': participants,
-                    'total': len(participants)
-                }
+                    return {
+                        'success': True,
+                        'participants': participants,
+                        'total': len(participants)
+                    }
 
             except Exception as e:
                 logger.error(f"Error getting chat participants: {e}")
                 return {'success': False, 'error': str(e)}
-            finally:
-                await client.disconnect()
 
-        return loop.run_until_complete(_get_participants())
+        return self._run(_get_participants())
 
     def get_user_info(self, session_string, user_id):
         """Get detailed info about a specific user.
@@ -983,46 +1102,42 @@ class TelegramClientManager:
         Returns:
             Dict with user info
         """
-        loop = self._get_event_loop()
-        client = self.get_client(session_string)
 
         async def _get_user():
             try:
                 from telethon.tl.functions.users import GetFullUserRequest
 
-                await client.connect()
-                full_user = await client(GetFullUserRequest(user_id))
-                user = full_user.users[0] if full_user.users else None
+                async with self._session_client(session_string) as client:
+                    full_user = await client(GetFullUserRequest(user_id))
+                    user = full_user.users[0] if full_user.users else None
 
-                if not user:
-                    return {'success': False, 'error': 'User not found'}
+                    if not user:
+                        return {'success': False, 'error': 'User not found'}
 
-                bio = ''
-                if hasattr(full_user, 'full_user') and full_user.full_user:
-                    bio = full_user.full_user.about or ''
+                    bio = ''
+                    if hasattr(full_user, 'full_user') and full_user.full_user:
+                        bio = full_user.full_user.about or ''
 
-                return {
-                    'success': True,
-                    'user': {
-                        'user_id': user.id,
-                        'username': user.username,
-                        'first_name': user.first_name,
-                        'last_name': user.last_name,
-                        'phone': user.phone if hasattr(user, 'phone') else None,
-                        'is_bot': user.bot if hasattr(user, 'bot') else False,
-                        'is_verified': user.verified if hasattr(user, 'verified') else False,
-                        'is_premium': user.premium if hasattr(user, 'premium') else False,
-                        'bio': bio,
+                    return {
+                        'success': True,
+                        'user': {
+                            'user_id': user.id,
+                            'username': user.username,
+                            'first_name': user.first_name,
+                            'last_name': user.last_name,
+                            'phone': user.phone if hasattr(user, 'phone') else None,
+                            'is_bot': user.bot if hasattr(user, 'bot') else False,
+                            'is_verified': user.verified if hasattr(user, 'verified') else False,
+                            'is_premium': user.premium if hasattr(user, 'premium') else False,
+                            'bio': bio,
+                        }
                     }
-                }
 
             except Exception as e:
                 logger.error(f"Error getting user info: {e}")
                 return {'success': False, 'error': str(e)}
-            finally:
-                await client.disconnect()
 
-        return loop.run_until_complete(_get_user())
+        return self._run(_get_user())
 
 
 def run_background_sync(sync_task_id):
@@ -1036,7 +1151,8 @@ def run_background_sync(sync_task_id):
         from django.utils import timezone
         from django.conf import settings as django_settings
         from django.core.files import File
-        from .models import SyncTask, TelegramChat, TelegramMessage, TelegramUser, ChatMembership
+        from django.db import connection
+        from .models import SyncTask, TelegramChat, TelegramMessage, TelegramUser, MessageDailyRollup
 
         sync_logger.info(f"BACKGROUND SYNC STARTED: Task #{sync_task_id} in thread {threading.current_thread().name}")
 
@@ -1056,18 +1172,19 @@ def run_background_sync(sync_task_id):
                 sync_logger.error(f"Failed to update task status: {e}")
 
         try:
-            sync_task = SyncTask.objects.get(id=sync_task_id)
-            session = sync_task.session
+            session = SyncTask.objects.select_related('session').get(id=sync_task_id).session
+
+            # Move the task to running; fails if it was cancelled or another worker has it
+            sync_task = SyncTask.claim_next(session, task_id=sync_task_id)
+            if sync_task is None:
+                sync_logger.warning(f"Task #{sync_task_id} is no longer pending, not starting it")
+                return
+
             session_string = session.get_session_string()
             sync_logger.info(f"Task #{sync_task_id}: Retrieved session for user {session.user_id}")
-
-            # Update status to running
-            sync_task.status = 'running'
-            sync_task.started_at = timezone.now()
-            sync_task.save()
             sync_task.add_log('Sync started')
 
-            manager = TelegramClientManager()
+            manager = telegram_manager
 
             # First, get all chats
             sync_task.add_log('Fetching chat list from Telegram...')
@@ -1084,7 +1201,7 @@ def run_background_sync(sync_task_id):
 
             chats = chats_result['chats']
             sync_task.total_chats = len(chats)
-            sync_task.save()
+            sync_task.flush_progress(force=True)
             sync_task.add_log(f'Found {len(chats)} chats')
             sync_logger.info(f"Task #{sync_task_id}: Found {len(chats)} chats to sync")
 
@@ -1092,7 +1209,7 @@ def run_background_sync(sync_task_id):
             for i, chat_data in enumerate(chats):
                 try:
                     # Check if task was cancelled
-                    sync_task.refresh_from_db()
+                    sync_task.refresh_from_db(fields=['status'])
                     if sync_task.status == 'cancelled':
                         sync_logger.info(f"Task #{sync_task_id}: Cancelled by user at chat {i+1}/{len(chats)}")
                         sync_task.add_log('Sync cancelled by user')
@@ -1108,7 +1225,7 @@ def run_background_sync(sync_task_id):
                     sync_task.current_chat_id = chat_id
                     sync_task.current_chat_title = chat_title
                     sync_task.current_chat_progress = 0
-                    sync_task.save()
+                    sync_task.flush_progress(force=True)
                     sync_task.add_log(f'Syncing chat: {chat_title}')
 
                     # Get or create TelegramChat
@@ -1133,7 +1250,10 @@ def run_background_sync(sync_task_id):
                         telegram_chat.members_count = chat_data.get('members_count')
                         telegram_chat.is_archived = chat_data.get('is_archived', False)
                         telegram_chat.is_pinned = chat_data.get('is_pinned', False)
-                        telegram_chat.save()
+                        telegram_chat.save(update_fields=[
+                            'title', 'chat_type', 'username', 'members_count',
+                            'is_archived', 'is_pinned', 'last_synced',
+                        ])
 
                     # Fetch messages for this chat (with media download)
                     min_id = telegram_chat.last_message_id or 0
@@ -1151,60 +1271,33 @@ def run_background_sync(sync_task_id):
                         new_count = 0
                         media_count = 0
                         skipped_count = 0
+                        ingested = False
 
-                        for msg_data in messages:
-                            try:
-                                msg_obj, msg_created = TelegramMessage.objects.get_or_create(
-                                    chat=telegram_chat,
-                                    message_id=msg_data['id'],
-                                    defaults={
-                                        'text': msg_data['text'],
-                                        'date': msg_data['date'],
-                                        'sender_id': msg_data['sender_id'],
-                                        'sender_name': msg_data['sender_name'],
-                                        'is_outgoing': msg_data['is_outgoing'],
-                                        'has_media': msg_data['has_media'],
-                                        'media_type': msg_data['media_type'],
-                                        'reply_to_msg_id': msg_data['reply_to_msg_id'],
-                                        'forwards': msg_data['forwards'],
-                                        'views': msg_data['views'],
-                                        # Media file fields
-                                        'media_file': msg_data.get('media_file_path'),
-                                        'media_file_name': msg_data.get('media_file_name'),
-                                        'media_file_size': msg_data.get('media_file_size'),
-                                        'media_mime_type': msg_data.get('media_mime_type'),
-                                        'media_width': msg_data.get('media_width'),
-                                        'media_height': msg_data.get('media_height'),
-                                        'media_duration': msg_data.get('media_duration'),
-                                    }
-                                )
-                                if msg_created:
-                                    new_count += 1
-                                    if msg_data.get('media_file_path'):
-                                        media_count += 1
-                                    elif msg_data.get('media_skipped'):
-                                        skipped_count += 1
-                                elif msg_data.get('media_file_path') and not msg_obj.media_file:
-                                    # Update existing message with media if it wasn't downloaded before
-                                    msg_obj.media_file = msg_data['media_file_path']
-                                    msg_obj.media_file_name = msg_data.get('media_file_name')
-                                    msg_obj.media_file_size = msg_data.get('media_file_size')
-                                    msg_obj.media_mime_type = msg_data.get('media_mime_type')
-                                    msg_obj.media_width = msg_data.get('media_width')
-                                    msg_obj.media_height = msg_data.get('media_height')
-                                    msg_obj.media_duration = msg_data.get('media_duration')
-                                    msg_obj.save()
+                        try:
+                            created, media_updated = TelegramMessage.objects.bulk_ingest(telegram_chat, messages)
+                            ingested = True
+                            new_count = len(created)
+                            for msg_data in created:
+                                if msg_data.get('media_file_path'):
                                     media_count += 1
-                            except Exception as msg_err:
-                                sync_logger.warning(f"Task #{sync_task_id}: Error saving message {msg_data.get('id')}: {msg_err}")
-
-                        # Update chat stats
-                        if messages:
+                                elif msg_data.get('media_skipped'):
+                                    skipped_count += 1
+                            media_count += media_updated
+                        except Exception as msg_err:
+                            sync_logger.warning(f"Task #{sync_task_id}: Error saving messages of chat {chat_id}: {msg_err}")
+
+                        # Update chat stats; keep the old high-water mark if the
+                        # batch was not stored so the next sync fetches it again
+                        if messages and ingested:
                             max_msg_id = max(m['id'] for m in messages)
                             telegram_chat.last_message_id = max_msg_id
                         telegram_chat.total_messages = telegram_chat.messages.count()
                         telegram_chat.last_full_sync = timezone.now()
-                        telegram_chat.save()
+                        telegram_chat.save(update_fields=['last_message_id', 'total_messages', 'last_full_sync', 'last_synced'])
+                        if new_count:
+                            MessageDailyRollup.refresh_for_chat(
+                                telegram_chat, dates=[msg_data['date'] for msg_data in created]
+                            )
 
                         # Update sync task progress
                         sync_task.synced_messages += len(messages)
@@ -1227,68 +1320,11 @@ def run_background_sync(sync_task_id):
 
                             if participants_result['success']:
                                 participants = participants_result['participants']
-                                new_users = 0
-                                updated_users = 0
-
-                                for p in participants:
-                                    # Get or create TelegramUser
-                                    tg_user, user_created = TelegramUser.objects.get_or_create(
-                                        session=session,
-                                        user_id=p['user_id'],
-                                        defaults={
-                                            'username': p.get('username'),
-                                            'first_name': p.get('first_name'),
-                                            'last_name': p.get('last_name'),
-                                            'phone': p.get('phone'),
-                                            'is_bot': p.get('is_bot', False),
-                                            'is_verified': p.get('is_verified', False),
-                                            'is_premium': p.get('is_premium', False),
-                                            'is_scam': p.get('is_scam', False),
-                                            'is_fake': p.get('is_fake', False),
-                                            'is_deleted': p.get('is_deleted', False),
-                                            'status': p.get('status'),
-                                            'last_online': p.get('last_online'),
-                                            'photo_id': p.get('photo_id'),
-                                        }
-                                    )
-
-                                    if user_created:
-                                        new_users += 1
-                                    else:
-                                        # Update existing user info
-                                        tg_user.username = p.get('username')
-                                        tg_user.first_name = p.get('first_name')
-                                        tg_user.last_name = p.get('last_name')
-                                        tg_user.is_bot = p.get('is_bot', False)
-                                        tg_user.is_verified = p.get('is_verified', False)
-                                        tg_user.is_premium = p.get('is_premium', False)
-                                        tg_user.is_scam = p.get('is_scam', False)
-                                        tg_user.is_fake = p.get('is_fake', False)
-                                        tg_user.is_deleted = p.get('is_deleted', False)
-                                        tg_user.status = p.get('status')
-                                        tg_user.last_online = p.get('last_online')
-                                        tg_user.save()
-                                        updated_users += 1
-
-                                    # Get or create ChatMembership
-                                    membership, mem_created = ChatMembership.objects.get_or_create(
-                                        telegram_user=tg_user,
-                                        chat=telegram_chat,
-                                        defaults={
-                                            'role': p.get('role', 'member'),
-                                            'admin_title': p.get('admin_title'),
-                                            'admin_rights': p.get('admin_rights', {}),
-                                            'is_member': True,
-                                        }
-                                    )
-
-                                    if not mem_created:
-                                        # Update membership info
-                                        membership.role = p.get('role', 'member')
-                                        membership.admin_title = p.get('admin_title')
-                                        membership.admin_rights = p.get('admin_rights', {})
-                                        membership.is_member = True
-                                        membership.save()
+                                new_user_ids, _ = TelegramUser.objects.bulk_sync_participants(
+                                    session, telegram_chat, participants
+                                )
+                                new_users = len(new_user_ids)
+                                updated_users = len(participants) - new_users
 
                                 sync_task.synced_users += len(participants)
                                 sync_task.add_log(f'  - Synced {len(participants)} members ({new_users} new, {updated_users} updated)')
@@ -1308,7 +1344,7 @@ def run_background_sync(sync_task_id):
 
                 # Update synced chats count
                 sync_task.synced_chats = i + 1
-                sync_task.save()
+                sync_task.flush_progress()
 
             # Complete
             sync_task.status = 'completed'
@@ -1332,6 +1368,11 @@ def run_background_sync(sync_task_id):
             except Exception as db_error:
                 sync_logger.error(f"Failed to update SyncTask #{sync_task_id}: {str(db_error)}")
 
+        finally:
+            # Request-cycle signals never run in this thread, so release its
+            # connection here at the task boundary
+            connection.close()
+
 
 def start_background_sync(sync_task):
     """Start the sync in a background thread."""
@@ -1,3 +1,209 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.contrib.auth import get_user_model
 from django.test import TestCase
+from django.utils import timezone
+
+from .analytics import AnalyticsService
+from .models import (
+    AnalyticsCache, MessageDailyRollup, SyncTask, TelegramChat, TelegramMessage, TelegramSession,
+)
+
+
+def message_data(message_id, date, **overrides):
+    """Build message data in the shape returned by fetch_all_messages_from_chat."""
+    data = {
+        'id': message_id,
+        'text': f'message {message_id}',
+        'date': date,
+        'sender_id': None,
+        'sender_name': '',
+        'is_outgoing': message_id % 2 == 0,
+        'has_media': False,
+        'media_type': None,
+        'reply_to_msg_id': None,
+        'forwards': None,
+        'views': None,
+    }
+    data.update(overrides)
+    return data
+
+
+class TelegramDataMixin:
+    """Create a user with one session and one chat."""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            username='alice', email='alice@example.com', password='secret'
+        )
+        self.session = TelegramSession.objects.create(user=self.user, phone_number='+10000000000')
+        self.chat = TelegramChat.objects.create(
+            session=self.session, chat_id=1, chat_type='group', title='Chat'
+        )
+
+
+class MessageDailyRollupTests(TelegramDataMixin, TestCase):
+    def snapshot(self):
+        return list(MessageDailyRollup.objects.filter(chat=self.chat).order_by('day').values_list(
+            'day', 'count', 'outgoing', 'incoming', 'deleted', 'media_count', 'hour_counts'
+        ))
+
+    def test_incremental_refresh_matches_full_rebuild(self):
+        start = datetime(2026, 1, 1, 10, tzinfo=dt_timezone.utc)
+        history = [message_data(i, start + timedelta(hours=7 * i)) for i in range(1, 20)]
+        TelegramMessage.objects.bulk_upsert(self.chat, history)
+        MessageDailyRollup.refresh_for_chat(self.chat)
+
+        # A later batch touching the last stored day and two new days
+        last = history[-1]['date']
+        batch = [
+            message_data(100, last + timedelta(minutes=5), has_media=True, media_type='MessageMediaPhoto'),
+            message_data(101, last + timedelta(days=1)),
+            message_data(102, last + timedelta(days=2)),
+        ]
+        TelegramMessage.objects.bulk_upsert(self.chat, batch)
+        MessageDailyRollup.refresh_for_chat(self.chat, dates=[m['date'] for m in batch])
+        incremental = self.snapshot()
+
+        MessageDailyRollup.refresh_for_chat(self.chat)
+        self.assertEqual(incremental, self.snapshot())
+        self.assertEqual(sum(row[1] for row in incremental), len(history) + len(batch))
+
+    def test_refresh_without_dates_in_batch_keeps_rollups(self):
+        TelegramMessage.objects.bulk_upsert(
+            self.chat, [message_data(1, datetime(2026, 1, 1, tzinfo=dt_timezone.utc))]
+        )
+        MessageDailyRollup.refresh_for_chat(self.chat)
+
+        MessageDailyRollup.refresh_for_chat(self.chat, dates=[])
+        self.assertEqual(len(self.snapshot()), 1)
+
+
+class TelegramMessageManagerTests(TelegramDataMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.start = datetime(2026, 1, 1, 12, tzinfo=dt_timezone.utc)
+
+    def test_bulk_upsert_updates_synced_fields_and_media_kind(self):
+        TelegramMessage.objects.bulk_upsert(self.chat, [
+            message_data(1, self.start),
+            message_data(2, self.start + timedelta(minutes=1)),
+        ])
+        TelegramMessage.objects.bulk_upsert(self.chat, [
+            message_data(1, self.start, text='edited', has_media=True, media_type='MessageMediaPhoto'),
+        ])
+
+        self.assertEqual(TelegramMessage.objects.filter(chat=self.chat).count(), 2)
+        message = TelegramMessage.objects.get(chat=self.chat, message_id=1)
+        self.assertEqual(message.text, 'edited')
+        self.assertEqual(message.media_kind, TelegramMessage.MEDIA_IMAGE)
+        self.assertTrue(message.is_image)
+
+    def test_bulk_upsert_classifies_by_stored_mime_type(self):
+        TelegramMessage.objects.create(
+            chat=self.chat, message_id=1, date=self.start, has_media=True,
+            media_type='MessageMediaDocument', media_mime_type='video/mp4',
+        )
+        TelegramMessage.objects.bulk_upsert(self.chat, [
+            message_data(1, self.start, has_media=True, media_type='MessageMediaDocument'),
+        ])
+
+        message = TelegramMessage.objects.get(chat=self.chat, message_id=1)
+        self.assertEqual(message.media_mime_type, 'video/mp4')
+        self.assertEqual(message.media_kind, TelegramMessage.MEDIA_VIDEO)
+
+    def test_mark_missing_deleted(self):
+        TelegramMessage.objects.bulk_upsert(
+            self.chat, [message_data(i, self.start + timedelta(minutes=i)) for i in (1, 2, 3)]
+        )
+
+        self.assertEqual(TelegramMessage.objects.mark_missing_deleted(self.chat, [1, 3]), 1)
+        self.assertEqual(
+            list(TelegramMessage.objects.filter(chat=self.chat, is_deleted=True).values_list('message_id', flat=True)),
+            [2],
+        )
+        # Already deleted messages are not counted again
+        self.assertEqual(TelegramMessage.objects.mark_missing_deleted(self.chat, [1, 3]), 0)
+
+    def test_mark_missing_deleted_ignores_empty_fetch(self):
+        TelegramMessage.objects.bulk_upsert(self.chat, [message_data(1, self.start)])
+
+        self.assertEqual(TelegramMessage.objects.mark_missing_deleted(self.chat, []), 0)
+        self.assertFalse(TelegramMessage.objects.filter(chat=self.chat, is_deleted=True).exists())
+
+
+class TelegramSessionTests(TelegramDataMixin, TestCase):
+    def test_set_as_current_keeps_one_current_session(self):
+        other = TelegramSession.objects.create(user=self.user, phone_number='+10000000001')
+
+        # Switch back and forth so the UPDATE meets the rows in both orders
+        for session in (self.session, other, self.session, other):
+            session.set_as_current()
+            self.assertTrue(session.is_current)
+            self.assertEqual(
+                list(TelegramSession.objects.filter(user=self.user, is_current=True).values_list('pk', flat=True)),
+                [session.pk],
+            )
+
+
+class SyncTaskClaimTests(TelegramDataMixin, TestCase):
+    def create_task(self, minutes_ago, status='pending'):
+        task = SyncTask.objects.create(session=self.session, status=status)
+        SyncTask.objects.filter(pk=task.pk).update(created_at=timezone.now() - timedelta(minutes=minutes_ago))
+        return task
+
+    def test_claims_oldest_pending_task(self):
+        newer = self.create_task(1)
+        older = self.create_task(5)
+        self.create_task(10, status='completed')
+
+        claimed = SyncTask.claim_next(self.session)
+        self.assertEqual(claimed.pk, older.pk)
+        self.assertEqual(claimed.status, 'running')
+        self.assertIsNotNone(claimed.started_at)
+
+        self.assertEqual(SyncTask.claim_next(self.session).pk, newer.pk)
+        self.assertIsNone(SyncTask.claim_next(self.session))
+
+    def test_claims_given_task_only_while_pending(self):
+        first = self.create_task(5)
+        second = self.create_task(1)
+
+        self.assertEqual(SyncTask.claim_next(self.session, task_id=second.pk).pk, second.pk)
+        self.assertIsNone(SyncTask.claim_next(self.session, task_id=second.pk))
+        first.refresh_from_db()
+        self.assertEqual(first.status, 'pending')
+
+
+class CachedAnalyticTests(TelegramDataMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        TelegramMessage.objects.bulk_upsert(self.chat, [message_data(1, timezone.now() - timedelta(days=1))])
+        MessageDailyRollup.refresh_for_chat(self.chat)
+        self.analytics = AnalyticsService(self.session)
+
+    def cache_rows(self):
+        return AnalyticsCache.objects.filter(session=self.session, cache_type='daily_stats')
+
+    def test_equal_arguments_share_one_entry(self):
+        by_int = self.analytics.get_daily_message_counts(days=7, chat_id=1)
+        by_str = self.analytics.get_daily_message_counts(days=7, chat_id='1')
+
+        self.assertEqual(by_int, by_str)
+        self.assertEqual(self.cache_rows().count(), 1)
+
+    def test_hit_and_miss_return_the_same_types(self):
+        miss = self.analytics.get_daily_message_counts(days=7)
+        hit = self.analytics.get_daily_message_counts(days=7)
+
+        self.assertEqual(miss, hit)
+        self.assertIsInstance(miss[0]['day'], str)
+
+    def test_entries_are_served_until_they_expire(self):
+        self.analytics.get_daily_message_counts(days=7)
+        self.cache_rows().update(data=['cached'])
+        self.assertEqual(self.analytics.get_daily_message_counts(days=7), ['cached'])
 
-# Create your tests here.
+        self.cache_rows().update(expires_at=timezone.now() - timedelta(seconds=1))
+        self.assertNotEqual(self.analytics.get_daily_message_counts(days=7), ['cached'])
+        self.assertEqual(self.cache_rows().count(), 1)
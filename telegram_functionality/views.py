@@ -5,11 +5,11 @@ from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.http import JsonResponse, FileResponse, Http404
 from django.utils import timezone
-from django.db.models import Q
+from django.db.models import Count, Q, Sum
 from django.conf import settings
 
 from .forms import PhoneNumberForm, VerificationCodeForm, TwoFactorForm, AdvancedSearchForm
-from .models import TelegramSession, TelegramChat, TelegramMessage, SyncTask
+from .models import TelegramSession, TelegramChat, TelegramMessage, SyncTask, MessageDailyRollup
 from .services import telegram_manager, start_background_sync
 
 # Logging imports
@@ -23,6 +23,9 @@ from telegram_analyzer_app.logging_utils import (
     get_client_ip,
 )
 
+# Fields written when a message's media is downloaded on demand
+MEDIA_DOWNLOAD_FIELDS = ['media_file', 'media_file_name', 'media_file_size', 'media_mime_type', 'last_seen_at']
+
 
 def get_current_session(user):
     """
@@ -72,10 +75,10 @@ def home(request):
 @login_required
 def download_media(request, message_id):
     """Download or serve media file for a message."""
-    message = get_object_or_404(TelegramMessage, id=message_id)
+    message = get_object_or_404(TelegramMessage.objects.with_context(), id=message_id)
 
     # Security check: ensure user owns this message
-    if message.chat.session.user != request.user:
+    if message.chat.session.user_id != request.user.id:
         raise Http404("Media not found")
 
     if not message.media_file:
@@ -669,24 +672,7 @@ def sync_all_chats(request):
         )
 
         if msg_result['success']:
-            for msg_data in msg_result['messages']:
-                TelegramMessage.objects.update_or_create(
-                    chat=chat,
-                    message_id=msg_data['id'],
-                    defaults={
-                        'text': msg_data['text'],
-                        'date': msg_data['date'],
-                        'sender_id': msg_data['sender_id'],
-                        'sender_name': msg_data['sender_name'],
-                        'is_outgoing': msg_data['is_outgoing'],
-                        'has_media': msg_data['has_media'],
-                        'media_type': msg_data['media_type'],
-                        'reply_to_msg_id': msg_data['reply_to_msg_id'],
-                        'forwards': msg_data['forwards'],
-                        'views': msg_data['views'],
-                    }
-                )
-                synced_messages += 1
+            synced_messages += TelegramMessage.objects.bulk_upsert(chat, msg_result['messages'])
 
             # Update chat's last message ID
             if msg_result['messages']:
@@ -694,7 +680,8 @@ def sync_all_chats(request):
                 chat.last_message_id = max_id
                 chat.last_full_sync = timezone.now()
                 chat.total_messages = chat.messages.count()
-                chat.save()
+                chat.save(update_fields=['last_message_id', 'last_full_sync', 'total_messages', 'last_synced'])
+                MessageDailyRollup.refresh_for_chat(chat, dates=[m['date'] for m in msg_result['messages']])
 
     if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
         return JsonResponse({
@@ -744,25 +731,7 @@ def sync_chat_messages(request, chat_id):
     if not result['success']:
         return JsonResponse({'success': False, 'error': result.get('error')})
 
-    synced = 0
-    for msg_data in result['messages']:
-        TelegramMessage.objects.update_or_create(
-            chat=chat,
-            message_id=msg_data['id'],
-            defaults={
-                'text': msg_data['text'],
-                'date': msg_data['date'],
-                'sender_id': msg_data['sender_id'],
-                'sender_name': msg_data['sender_name'],
-                'is_outgoing': msg_data['is_outgoing'],
-                'has_media': msg_data['has_media'],
-                'media_type': msg_data['media_type'],
-                'reply_to_msg_id': msg_data['reply_to_msg_id'],
-                'forwards': msg_data['forwards'],
-                'views': msg_data['views'],
-            }
-        )
-        synced += 1
+    synced = TelegramMessage.objects.bulk_upsert(chat, result['messages'])
 
     # Update chat metadata
     if result['messages']:
@@ -770,7 +739,9 @@ def sync_chat_messages(request, chat_id):
         chat.last_message_id = max_id
     chat.last_full_sync = timezone.now()
     chat.total_messages = chat.messages.count()
-    chat.save()
+    chat.save(update_fields=['last_message_id', 'last_full_sync', 'total_messages', 'last_synced'])
+    if synced:
+        MessageDailyRollup.refresh_for_chat(chat, dates=[m['date'] for m in result['messages']])
 
     if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
         return JsonResponse({'success': True, 'synced': synced})
@@ -804,20 +775,12 @@ def check_deleted_messages(request, chat_id=None):
         if not result['success']:
             continue
 
-        telegram_ids = result['message_ids']
+        # Messages missing from Telegram were deleted there
+        chat_deleted = TelegramMessage.objects.mark_missing_deleted(chat, result['message_ids'])
 
-        # Get message IDs we have in database (not already marked deleted)
-        db_messages = TelegramMessage.objects.filter(
-            chat=chat, is_deleted=False
-        )
-
-        for msg in db_messages:
-            if msg.message_id not in telegram_ids:
-                # Message was deleted from Telegram
-                msg.is_deleted = True
-                msg.deleted_at = timezone.now()
-                msg.save()
-                deleted_count += 1
+        if chat_deleted:
+            MessageDailyRollup.refresh_for_chat(chat)
+            deleted_count += chat_deleted
 
     if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
         return JsonResponse({'success': True, 'deleted_found': deleted_count})
@@ -880,10 +843,7 @@ def start_sync(request):
         return redirect('telegram:connect')
 
     # Check if there's already a running sync
-    running_sync = SyncTask.objects.filter(
-        session=session,
-        status__in=['pending', 'running']
-    ).first()
+    running_sync = SyncTask.objects.active().filter(session=session).first()
 
     if running_sync:
         logger.info(f"User {request.user.id} has existing sync in progress: Task #{running_sync.id}")
@@ -1134,17 +1094,13 @@ def search_messages(request):
         elif media_filter == 'no_media':
             queryset = queryset.filter(has_media=False)
         elif media_filter == 'photo':
-            queryset = queryset.filter(has_media=True, media_mime_type__startswith='image/')
+            queryset = queryset.filter(media_kind=TelegramMessage.MEDIA_IMAGE)
         elif media_filter == 'video':
-            queryset = queryset.filter(has_media=True, media_mime_type__startswith='video/')
+            queryset = queryset.filter(media_kind=TelegramMessage.MEDIA_VIDEO)
         elif media_filter == 'document':
-            queryset = queryset.filter(has_media=True).exclude(
-                Q(media_mime_type__startswith='image/') |
-                Q(media_mime_type__startswith='video/') |
-                Q(media_mime_type__startswith='audio/')
-            )
+            queryset = queryset.filter(media_kind__in=TelegramMessage.DOCUMENT_KINDS)
         elif media_filter == 'audio':
-            queryset = queryset.filter(has_media=True, media_mime_type__startswith='audio/')
+            queryset = queryset.filter(media_kind=TelegramMessage.MEDIA_AUDIO)
 
         # Deleted filter
         deleted_filter = form.cleaned_data.get('deleted_filter')
@@ -1252,10 +1208,10 @@ def search_chats(request):
 @login_required
 def trigger_media_download(request, message_id):
     """Trigger manual download of a single message's media."""
-    message = get_object_or_404(TelegramMessage, id=message_id)
+    message = get_object_or_404(TelegramMessage.objects.with_context(), id=message_id)
 
     # Security check: ensure user owns this message
-    if message.chat.session.user != request.user:
+    if message.chat.session.user_id != request.user.id:
         return JsonResponse({'success': False, 'error': 'Access denied'}, status=403)
 
     if not message.has_media:
@@ -1284,7 +1240,7 @@ def trigger_media_download(request, message_id):
             message.media_file_name = result.get('file_name')
             message.media_file_size = result.get('file_size')
             message.media_mime_type = result.get('mime_type')
-            message.save()
+            message.save(update_fields=MEDIA_DOWNLOAD_FIELDS)
 
             return JsonResponse({
                 'success': True,
@@ -1314,18 +1270,15 @@ def pending_downloads_api(request):
         Q(media_file='') | Q(media_file__isnull=True)
     )
 
-    # Count and calculate total size
-    total_count = pending.count()
-
-    # Sum up known file sizes
-    total_size = 0
-    size_unknown_count = 0
-
-    for msg in pending.values('media_file_size'):
-        if msg['media_file_size']:
-            total_size += msg['media_file_size']
-        else:
-            size_unknown_count += 1
+    # Count and sum up known file sizes
+    totals = pending.aggregate(
+        total_count=Count('pk'),
+        total_size=Sum('media_file_size'),
+        size_unknown_count=Count('pk', filter=Q(media_file_size__isnull=True) | Q(media_file_size=0)),
+    )
+    total_count = totals['total_count']
+    total_size = totals['total_size'] or 0
+    size_unknown_count = totals['size_unknown_count']
 
     return JsonResponse({
         'success': True,
@@ -1422,7 +1375,7 @@ def start_bulk_download(request):
                 message.media_file_name = result.get('file_name')
                 message.media_file_size = result.get('file_size')
                 message.media_mime_type = result.get('mime_type')
-                message.save()
+                message.save(update_fields=MEDIA_DOWNLOAD_FIELDS)
                 downloaded += 1
             else:
                 failed += 1
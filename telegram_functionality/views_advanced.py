@@ -29,6 +29,7 @@ from .models import (
     TelegramUser, ChatMembership
 )
 from .analytics import AnalyticsService
+from .audit import audit_writer
 from .services import telegram_manager
 from .views import get_current_session, get_session_or_redirect, get_all_user_sessions
 
@@ -37,9 +38,17 @@ from .views import get_current_session, get_session_or_redirect, get_all_user_se
 # Audit Log Helper
 # ============================================
 
-def log_audit(request, action, description='', session=None, chat=None, message=None, metadata=None):
-    """Helper to create audit log entries."""
-    AuditLog.objects.create(
+# Actions written synchronously rather than through the background writer
+SYNC_AUDIT_ACTIONS = frozenset({'login', 'logout', 'disconnect_telegram', 'delete_data'})
+
+
+def log_audit(request, action, description='', session=None, chat=None, message=None, metadata=None, sync=False):
+    """Helper to create audit log entries.
+
+    Entries are queued for a background batch insert unless ``sync`` is set
+    or the action is in SYNC_AUDIT_ACTIONS.
+    """
+    entry = AuditLog(
         user=request.user,
         action=action,
         description=description,
@@ -50,13 +59,17 @@ def log_audit(request, action, description='', session=None, chat=None, message=
         message=message,
         metadata=metadata or {},
     )
+    if sync or action in SYNC_AUDIT_ACTIONS:
+        entry.save()
+    else:
+        audit_writer.enqueue(entry)
 
 
 def get_client_ip(request):
     """Get client IP address from request."""
     x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
     if x_forwarded_for:
-        ip = x_forwarded_for.split(',')[0]
+        ip = x_forwarded_for.partition(',')[0]
     else:
         ip = request.META.get('REMOTE_ADDR')
     return ip
@@ -229,6 +242,9 @@ def analytics_api(request, stat_type):
             data = analytics.get_media_stats(chat_id=chat_id)
         elif stat_type == 'heatmap':
             data = analytics.get_activity_heatmap(days=days, chat_id=chat_id)
+        elif stat_type == 'text':
+            # Word, emoji, link and length panels from a single scan of the texts
+            data = analytics.get_text_analytics(days=days, chat_id=chat_id)
         else:
             return JsonResponse({'error': 'Unknown stat type'}, status=400)
 
@@ -293,6 +309,7 @@ def export_json(request):
         messages = messages.filter(is_deleted=False)
 
     messages = messages.select_related('chat').order_by('chat', 'date')
+    total_messages = messages.count()
 
     # Build export data
     export_data = {
@@ -301,11 +318,11 @@ def export_json(request):
             'phone': session.phone_number,
             'telegram_username': session.telegram_username,
         },
-        'total_messages': messages.count(),
+        'total_messages': total_messages,
         'messages': []
     }
 
-    for msg in messages:
+    for msg in messages.stream():
         export_data['messages'].append({
             'id': msg.message_id,
             'chat_id': msg.chat.chat_id,
@@ -332,13 +349,13 @@ def export_json(request):
     response['Content-Disposition'] = f'attachment; filename="{filename}"'
 
     # Log export
-    log_audit(request, 'export_data', f'Exported {messages.count()} messages to JSON', session=session)
+    log_audit(request, 'export_data', f'Exported {total_messages} messages to JSON', session=session)
 
     # Save to backup history
     BackupHistory.objects.create(
         user=request.user,
         status='completed',
-        messages_count=messages.count(),
+        messages_count=total_messages,
         file_size=len(response.content),
     )
 
@@ -379,7 +396,9 @@ def export_csv(request):
         'Has Media', 'Media Type'
     ])
 
-    for msg in messages:
+    exported = 0
+    for msg in messages.stream():
+        exported += 1
         writer.writerow([
             msg.message_id,
             msg.chat.chat_id,
@@ -400,7 +419,7 @@ def export_csv(request):
     filename = f'telegram_export_{timezone.now().strftime("%Y%m%d_%H%M%S")}.csv'
     response['Content-Disposition'] = f'attachment; filename="{filename}"'
 
-    log_audit(request, 'export_data', f'Exported {messages.count()} messages to CSV', session=session)
+    log_audit(request, 'export_data', f'Exported {exported} messages to CSV', session=session)
 
     return response
 
@@ -433,7 +452,7 @@ def export_html(request):
     current_chat = None
     current_messages = []
 
-    for msg in messages_qs:
+    for msg in messages_qs.stream():
         if current_chat is None or current_chat.id != msg.chat.id:
             if current_chat is not None:
                 chats_data.append({
@@ -529,10 +548,10 @@ def bookmarks_list(request):
 @require_POST
 def toggle_bookmark(request, message_id):
     """Toggle bookmark on a message."""
-    message = get_object_or_404(TelegramMessage, id=message_id)
+    message = get_object_or_404(TelegramMessage.objects.with_context(), id=message_id)
 
     # Security check
-    if message.chat.session.user != request.user:
+    if message.chat.session.user_id != request.user.id:
         return JsonResponse({'error': 'Access denied'}, status=403)
 
     bookmark, created = MessageBookmark.objects.get_or_create(
@@ -633,9 +652,9 @@ def delete_tag(request, tag_id):
 @require_POST
 def tag_message(request, message_id):
     """Add/remove tags from a message."""
-    message = get_object_or_404(TelegramMessage, id=message_id)
+    message = get_object_or_404(TelegramMessage.objects.with_context(), id=message_id)
 
-    if message.chat.session.user != request.user:
+    if message.chat.session.user_id != request.user.id:
         return JsonResponse({'error': 'Access denied'}, status=403)
 
     data = json.loads(request.body)
@@ -792,9 +811,9 @@ def folder_chats(request, folder_id):
 @require_POST
 def add_note(request, message_id):
     """Add a note to a message."""
-    message = get_object_or_404(TelegramMessage, id=message_id)
+    message = get_object_or_404(TelegramMessage.objects.with_context(), id=message_id)
 
-    if message.chat.session.user != request.user:
+    if message.chat.session.user_id != request.user.id:
         return JsonResponse({'error': 'Access denied'}, status=403)
 
     data = json.loads(request.body)
@@ -865,18 +884,14 @@ def media_gallery(request):
     if chat_id:
         media_messages = media_messages.filter(chat__chat_id=int(chat_id))
 
-    if media_type == 'images':
-        media_messages = media_messages.filter(media_mime_type__startswith='image/')
-    elif media_type == 'videos':
-        media_messages = media_messages.filter(media_mime_type__startswith='video/')
-    elif media_type == 'audio':
-        media_messages = media_messages.filter(media_mime_type__startswith='audio/')
-    elif media_type == 'documents':
-        media_messages = media_messages.exclude(
-            Q(media_mime_type__startswith='image/') |
-            Q(media_mime_type__startswith='video/') |
-            Q(media_mime_type__startswith='audio/')
-        )
+    media_kinds = {
+        'images': [TelegramMessage.MEDIA_IMAGE],
+        'videos': [TelegramMessage.MEDIA_VIDEO],
+        'audio': [TelegramMessage.MEDIA_AUDIO],
+        'documents': TelegramMessage.DOCUMENT_KINDS,
+    }
+    if media_type in media_kinds:
+        media_messages = media_messages.filter(media_kind__in=media_kinds[media_type])
 
     total = media_messages.count()
     total_pages = (total + per_page - 1) // per_page
@@ -912,8 +927,7 @@ def media_slideshow(request):
 
     images = TelegramMessage.objects.filter(
         chat__session=session,
-        has_media=True,
-        media_mime_type__startswith='image/'
+        media_kind=TelegramMessage.MEDIA_IMAGE
     ).exclude(
         Q(media_file='') | Q(media_file__isnull=True)
     ).select_related('chat').order_by('-date')
@@ -1000,9 +1014,7 @@ def alert_triggers_list(request, alert_id):
     """View triggered alerts for a keyword alert."""
     alert = get_object_or_404(KeywordAlert, id=alert_id, user=request.user)
 
-    triggers = AlertTrigger.objects.filter(alert=alert).select_related(
-        'message', 'message__chat'
-    ).order_by('-triggered_at')[:100]
+    triggers = AlertTrigger.objects.filter(alert=alert).with_context().order_by('-triggered_at')[:100]
 
     context = {
         'alert': alert,
@@ -1021,7 +1033,7 @@ def alert_triggers_list(request, alert_id):
 @login_required
 def audit_log_list(request):
     """View audit logs."""
-    logs = AuditLog.objects.filter(user=request.user).order_by('-created_at')
+    logs = AuditLog.objects.filter(user=request.user).with_context().order_by('-created_at')
 
     # Filter by action type
     action = request.GET.get('action')
@@ -1073,12 +1085,13 @@ def find_duplicates(request):
     duplicate_groups = []
     for dup in duplicates[:50]:
         if dup['file_hash']:
+            file_hash = bytes(dup['file_hash'])
             messages = TelegramMessage.objects.filter(
-                media_hash__file_hash=dup['file_hash'],
+                media_hash__file_hash=file_hash,
                 chat__session=session
             ).select_related('chat')
             duplicate_groups.append({
-                'hash': dup['file_hash'],
+                'hash': file_hash.hex(),
                 'count': dup['count'],
                 'messages': list(messages),
             })
@@ -1116,7 +1129,7 @@ def compute_media_hashes(request):
             file_path = os.path.join(settings.MEDIA_ROOT, str(msg.media_file))
             if os.path.exists(file_path):
                 with open(file_path, 'rb') as f:
-                    file_hash = hashlib.md5(f.read()).hexdigest()
+                    file_hash = hashlib.file_digest(f, 'md5').digest()
 
                 MediaHash.objects.create(
                     message=msg,
@@ -1303,7 +1316,7 @@ def all_triggers_list(request):
     """View all triggered alerts across all keyword alerts."""
     triggers = AlertTrigger.objects.filter(
         alert__user=request.user
-    ).select_related('alert', 'message', 'message__chat').order_by('-triggered_at')
+    ).with_context().order_by('-triggered_at')
 
     # Filters
     selected_alert = request.GET.get('alert')
@@ -1684,50 +1697,15 @@ def sync_chat_members(request, chat_id):
         return JsonResponse({'error': result.get('error', 'Failed to get participants')}, status=500)
 
     # Save participants to database
-    synced_count = 0
-    updated_count = 0
-
-    for p in result['participants']:
-        # Get or create TelegramUser
-        tg_user, user_created = TelegramUser.objects.update_or_create(
-            session=session,
-            user_id=p['user_id'],
-            defaults={
-                'username': p['username'],
-                'first_name': p['first_name'],
-                'last_name': p['last_name'],
-                'phone': p.get('phone'),
-                'is_bot': p.get('is_bot', False),
-                'is_verified': p.get('is_verified', False),
-                'is_premium': p.get('is_premium', False),
-                'is_scam': p.get('is_scam', False),
-                'is_fake': p.get('is_fake', False),
-                'is_deleted': p.get('is_deleted', False),
-                'status': p.get('status'),
-                'last_online': p.get('last_online'),
-            }
-        )
-
-        # Get or create ChatMembership
-        membership, mem_created = ChatMembership.objects.update_or_create(
-            telegram_user=tg_user,
-            chat=chat,
-            defaults={
-                'role': p.get('role', 'member'),
-                'admin_title': p.get('admin_title'),
-                'admin_rights': p.get('admin_rights', {}),
-                'is_member': True,
-            }
-        )
-
-        if user_created or mem_created:
-            synced_count += 1
-        else:
-            updated_count += 1
+    new_user_ids, new_member_ids = TelegramUser.objects.bulk_sync_participants(
+        session, chat, result['participants']
+    )
+    synced_count = len(new_user_ids | new_member_ids)
+    updated_count = len(result['participants']) - synced_count
 
     # Update chat members count
     chat.members_count = result['total']
-    chat.save()
+    chat.save(update_fields=['members_count', 'last_synced'])
 
     log_audit(request, 'sync_messages', f'Synced {synced_count} members for {chat.title}', session=session, chat=chat)
 